@@ -1,8 +1,339 @@
 import re  # Regular expressions for parsing
-from typing import Dict, Union, Tuple, List, Any
+from typing import Dict, Union, Tuple, List, Any, NamedTuple, Iterable
 from functools import lru_cache  # For caching function results
+from types import MappingProxyType  # Read-only view of the shared base table
 from ModelUtils import validate_input
+import logging  # For optional debug tracing
 import math
+import operator  # Arithmetic as plain callables for the RPN program
+
+_log = logging.getLogger(__name__)
+
+class _BaseConfig(NamedTuple):
+    """Immutable settings for one number base, shared by every CalculatorModel."""
+    valid_digits: str  # Allowed digits (upper case)
+    base_int: int  # Integer representation of the base (2, 8, 10, 16)
+    available_digits: Tuple[str, ...]  # Valid digits for UI/input validation
+    max_display_digits: int  # Maximum number of digits allowed for display
+    strip_table: Dict[int, None]  # str.translate table deleting every valid digit (either case)
+
+def _make_base_config(valid_digits: str, base_int: int, max_display_digits: int) -> _BaseConfig:
+    return _BaseConfig(
+        valid_digits=valid_digits,
+        base_int=base_int,
+        available_digits=tuple(valid_digits),
+        max_display_digits=max_display_digits,
+        strip_table=str.maketrans('', '', valid_digits + valid_digits.lower())
+    )
+
+# Display Limits (64-bit):
+# - BIN: 64 digits (range: -2^63 to 2^63-1)
+# - OCT: 22 digits (⌈64/3⌉ digits for equivalent range)
+# - DEC: 20 digits (log10(2^64) ≈ 19.3, rounded up)
+# - HEX: 16 digits (⌈64/4⌉ digits for equivalent range)
+_BASE_CONFIGS = MappingProxyType({
+    'BIN': _make_base_config('01', 2, 64),
+    'OCT': _make_base_config('01234567', 8, 22),
+    'DEC': _make_base_config('0123456789', 10, 20),
+    'HEX': _make_base_config('0123456789ABCDEF', 16, 16)
+})
+
+# Flat per-base lookups for the hot paths (one dict probe, no attribute load)
+_BASE_INT = {base: config.base_int for base, config in _BASE_CONFIGS.items()}
+_STRIP_TABLES = {base: config.strip_table for base, config in _BASE_CONFIGS.items()}
+
+_VALID_BASES = frozenset(_BASE_CONFIGS)
+_BASE_ERR = f"Must be one of {list(_BASE_CONFIGS)}"  # Built once for the invalid-base messages
+
+# Largest magnitude representable in each base's display width (2**64 - 1 etc.)
+_MAX_VALUES = {base: config.base_int ** config.max_display_digits - 1 for base, config in _BASE_CONFIGS.items()}
+
+# Precompiled patterns used by the conversion and evaluation hot paths
+_UNARY_RE = re.compile(r'^\s*([+-])\s*|\(\s*([+-])\s*')  # Unary sign at start (1) or after open paren (2)
+_PURE_NUMBER_RE = re.compile(r'-?[0-9A-Fa-f]+')  # A lone (optionally negative) literal
+_EXPR_TOKEN_RE = re.compile(r'[0-9A-Fa-f.]+|\*\*|\S')  # Evaluator tokens (any other character is an error)
+
+# The conversion caches live at module level and are keyed on (value, base)
+# only: everything else is read from the immutable _BASE_CONFIGS, so there is
+# no `self` hashing and no instances pinned alive by the cache.
+
+@lru_cache(maxsize=4096)  # Literals ('1', '10', 'FF', ...) are highly repetitive
+def _to_decimal_cached(number_str: str, base: str) -> int:
+    """Convert a number string in `base` to decimal (see CalculatorModel.to_decimal)."""
+    # Handle negative numbers
+    is_negative = number_str.startswith('-')
+    if is_negative:
+        number_str = number_str[1:]
+        
+    # Validate the number string: deleting every valid digit must leave nothing
+    leftover = number_str.translate(_STRIP_TABLES[base])
+    if leftover:
+        invalid_digits = list(leftover.upper())  # What survived the strip is exactly the invalid part
+        raise ValueError(f"Invalid digit(s) {invalid_digits} for {base} number: {number_str}")
+        
+    # Convert based on the base; validation admits digits only, so DEC is an exact int too
+    try:
+        result = int(number_str, _BASE_INT[base])  # int() accepts either case, no upper() copy needed
+        return -result if is_negative else result
+        
+    except ValueError:
+        raise ValueError(f"Invalid {base} number: '{number_str}'")
+
+def _to_decimal_trusted(number_str: str, base: str, base_int: int) -> Union[int, float]:
+    """Convert an already-tokenized number without the Python-level digit scan.
+    
+    Callers pass either a lone literal matched by _PURE_NUMBER_RE (optional
+    '-' plus hex digits) or an _EXPR_TOKEN_RE number token from
+    _tokenize_expression (hex digits and '.', no sign). int(), or float() for
+    a DEC token containing '.', is the only validation needed; when it rejects
+    the token we defer to _to_decimal_cached purely to raise its detailed
+    error message.
+    """
+    try:
+        if base == 'DEC':
+            # Integral literals stay exact ints; decimals go through float()
+            return int(number_str) if '.' not in number_str else float(number_str)
+        return int(number_str, base_int)
+    except ValueError:
+        return _to_decimal_cached(number_str, base)
+
+# Digit string of a non-negative number in each base (no '0x'-style prefix)
+_INT_TO_BASE = {
+    'BIN': lambda number: format(number, 'b'),
+    'OCT': lambda number: format(number, 'o'),
+    'DEC': str,
+    'HEX': lambda number: format(number, 'X')
+}
+
+@lru_cache(maxsize=1024, typed=True)  # typed: 2 and 2.0 must not share an entry
+def _from_decimal_cached(number: Union[int, float], base: str) -> str:
+    """Convert a decimal int/float to its string form in `base` (see CalculatorModel.from_decimal)."""
+    if number == 0:
+        return '0'
+        
+    is_negative = number < 0
+    if is_negative:
+        number = -number
+        
+    # Callers guarantee int or float; identity tests cover the exact types, and
+    # only subclasses (bool, float subclasses) reach isinstance
+    number_type = type(number)
+    if number_type is int:
+        is_float = False
+    elif number_type is float:
+        is_float = True
+    else:
+        is_float = isinstance(number, float)
+        
+    # For float, skip digit limit check (since it's not representable in non-DEC bases)
+    if not is_float:
+        if number > _MAX_VALUES[base]:
+            raise ValueError(f"Number too large for {base} representation with {_BASE_CONFIGS[base].max_display_digits} digits")
+    
+    try:
+        if is_float and base != 'DEC':
+            # For non-DEC bases, return float as string (not representable)
+            return f"{'-' if is_negative else ''}{number} (non-integer, cannot represent in {base})"
+        result = _INT_TO_BASE[base](number)  # Magnitude only; the sign is added once below
+        return '-' + result if is_negative else result
+    except Exception as e:
+        raise ValueError(f"Error converting to {base}: {str(e)}")
+
+def _normalize_unary(match: re.Match) -> str:
+    """Replacement for _UNARY_RE: '-' / '' at the start, '(-' / '(' after a parenthesis."""
+    if match.group(1) is not None:
+        return '-' if match.group(1) == '-' else ''
+    return '(-' if match.group(2) == '-' else '('
+
+_HEX_DIGITS = frozenset('0123456789ABCDEFabcdef')
+_CONVERT_OPERATORS = frozenset('+-*/()')
+
+def _scan_convert_tokens(expr: str) -> List[str]:
+    """Split `expr` into numbers (with an attached '-' sign) and operators in one pass.
+    
+    A '-' directly before a digit belongs to the number; any character that is
+    neither a digit nor an operator (e.g. whitespace) is skipped.
+    """
+    tokens = []
+    i = 0
+    n = len(expr)
+    while i < n:
+        c = expr[i]
+        if c in _HEX_DIGITS or (c == '-' and i + 1 < n and expr[i + 1] in _HEX_DIGITS):
+            j = i + 1
+            while j < n and expr[j] in _HEX_DIGITS:
+                j += 1
+            tokens.append(expr[i:j])
+            i = j
+        else:
+            if c in _CONVERT_OPERATORS:
+                tokens.append(c)
+            i += 1
+    return tokens
+
+@lru_cache(maxsize=256)  # Whole expressions repeat far less than single literals
+def _convert_to_decimal_cached(expr: str, base: str) -> str:
+    """Rewrite every number in `expr` from `base` to decimal (see CalculatorModel.convert_to_decimal)."""
+    base_int = _BASE_INT[base]
+    
+    # Fast path: a single literal needs no tokenizing, list or join
+    stripped = expr.strip()
+    if _PURE_NUMBER_RE.fullmatch(stripped):
+        try:
+            return str(_to_decimal_trusted(stripped, base, base_int))
+        except ValueError as e:
+            raise ValueError(f"Error converting '{stripped}': {str(e)}")
+    
+    # Handle unary operators in one pass: keep a unary minus, drop a unary plus
+    if '-' in expr or '+' in expr:  # No sign, nothing to normalize
+        expr = _UNARY_RE.sub(_normalize_unary, expr)
+    
+    # Split into tokens preserving operators and parentheses
+    tokens = _scan_convert_tokens(expr)
+    
+    dec_expr = []
+    for token in tokens:
+        # Loop through each token in the expression to convert numbers to decimal
+        if token in _CONVERT_OPERATORS:
+            dec_expr.append(token)
+        else:
+            # Convert number to decimal; scanned tokens are an optional '-' plus
+            # hex digits, so int() is the only check needed (never DEC here)
+            try:
+                dec_expr.append(str(int(token, base_int)))
+            except ValueError:
+                try:
+                    _to_decimal_cached(token, base)  # Raises the detailed invalid-digit error
+                except ValueError as e:
+                    raise ValueError(f"Error converting '{token}': {str(e)}")
+                raise
+            
+    return ''.join(dec_expr)
+
+# Shunting-yard evaluator. Prefix operators ('neg', '√') sit between the
+# multiplicative operators and '^', so -2^2 == -4 and 2^-1 == 0.5 as in Python.
+_EXPR_OPERATORS = frozenset('+-*/^()√!')
+_NUMBER_START = frozenset('0123456789ABCDEFabcdef.')  # Characters a number token can begin with
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, 'neg': 3, '√': 3, '^': 4}
+
+# Opcodes of a compiled RPN program: push a number, or apply a 1- or 2-argument function
+_PUSH, _UNARY, _BINARY = 0, 1, 2
+_OPCODES = {
+    '+': (_BINARY, operator.add),
+    '-': (_BINARY, operator.sub),
+    '*': (_BINARY, operator.mul),
+    '/': (_BINARY, operator.truediv),
+    '^': (_BINARY, operator.pow),
+    'neg': (_UNARY, operator.neg),
+    '√': (_UNARY, math.sqrt),
+    '!': (_UNARY, math.factorial)
+}
+
+def _tokenize_expression(expr: str, base: str, base_int: int) -> List[Any]:
+    """Split an expression into operator strings and already-decimal numbers."""
+    tokens = []
+    for token in _EXPR_TOKEN_RE.findall(expr):
+        # Loop through each raw token, converting numbers from the input base
+        if token in _EXPR_OPERATORS:
+            tokens.append(token)
+        elif token == '**':
+            tokens.append('^')  # Python-style exponent
+        elif token[0] in _NUMBER_START:
+            try:
+                tokens.append(_to_decimal_trusted(token, base, base_int))
+            except ValueError as e:
+                raise ValueError(f"Error converting '{token}': {str(e)}")
+        else:
+            raise ValueError(f"Invalid character in expression: {token}")
+    return tokens
+
+def _to_rpn(tokens: List[Any]) -> Tuple[Tuple[int, Any], ...]:
+    """Reorder infix tokens into reverse Polish notation (shunting-yard).
+    
+    The result is an immutable program of (opcode, value) steps that
+    _eval_rpn can replay any number of times, so batch callers only pay for
+    parsing once per expression.
+    """
+    output = []
+    stack = []
+    expect_operand = True
+    for token in tokens:
+        if token.__class__ is not str:  # Number
+            if not expect_operand:
+                raise ValueError("Missing operator between numbers")
+            output.append(token)
+            expect_operand = False
+        elif token == '(':
+            if not expect_operand:
+                raise ValueError("Missing operator before parenthesis")
+            stack.append(token)
+        elif token == ')':
+            if expect_operand:
+                raise ValueError("Invalid closing parenthesis placement")
+            while stack and stack[-1] != '(':
+                output.append(stack.pop())
+            if not stack:
+                raise ValueError("Unmatched closing parenthesis")
+            stack.pop()
+        elif token == '!':
+            if expect_operand:
+                raise ValueError("Factorial must follow a number")
+            output.append(token)  # Postfix, binds tightest
+        elif expect_operand:
+            # Prefix position: unary sign or square root
+            if token == '-':
+                stack.append('neg')
+            elif token == '√':
+                stack.append(token)
+            elif token != '+':  # Unary plus is a no-op
+                raise ValueError(f"Invalid operator placement: '{token}'")
+        else:
+            if token == '√':
+                raise ValueError("Missing operator before '√'")
+            precedence = _PRECEDENCE[token]
+            while stack and stack[-1] != '(':
+                top = _PRECEDENCE[stack[-1]]
+                if top < precedence or (top == precedence and token == '^'):  # '^' is right-associative
+                    break
+                output.append(stack.pop())
+            stack.append(token)
+            expect_operand = True
+    if expect_operand:
+        raise ValueError("Expression cannot end with an operator")
+    while stack:
+        op = stack.pop()
+        if op == '(':
+            raise ValueError("Unclosed parenthesis")
+        output.append(op)
+    return tuple((_PUSH, item) if item.__class__ is not str else _OPCODES[item] for item in output)
+
+@lru_cache(maxsize=256)
+def _compile_expression(expr: str, base: str) -> Tuple[Tuple[int, Any], ...]:
+    """Tokenize and reorder `expr` once; repeats of the same (expr, base) reuse the program.
+    
+    Tokenizer errors propagate unchanged, parse errors carry the same
+    "Error evaluating expression" prefix that evaluation errors do.
+    """
+    tokens = _tokenize_expression(expr, base, _BASE_INT[base])
+    try:
+        return _to_rpn(tokens)
+    except ValueError as e:
+        raise ValueError(f"Error evaluating expression: {str(e)}")
+
+def _eval_rpn(rpn: Tuple[Tuple[int, Any], ...]) -> Union[int, float]:
+    """Evaluate an RPN program on a stack using exact int arithmetic where possible."""
+    stack = []
+    push = stack.append  # Bound once: this is the innermost loop on replay
+    pop = stack.pop
+    for kind, value in rpn:
+        if kind is _PUSH:
+            push(value)
+        elif kind is _UNARY:
+            stack[-1] = value(stack[-1])
+        else:  # _BINARY
+            right = pop()
+            stack[-1] = value(stack[-1], right)
+    return stack[0]
 
 class CalculatorModel:
     """A model class for handling mathematical calculations in different number bases.
@@ -20,49 +351,16 @@ class CalculatorModel:
     - Enforces maximum digit limits for each base
     """
     
-    def __init__(self):
+    __slots__ = ('base_configs', 'operators', 'functions')  # No per-instance __dict__
+    
+    def __init__(self) -> None:
         """Initialize calculator with base-specific configurations.
         
-        Sets up the configuration dictionary for each supported number base (BIN, OCT, DEC, HEX).
-        Each base configuration includes:
-        - valid_digits: String of allowed digits for the base
-        - base_int: Integer representation of the base (2, 8, 10, 16)
-        - available_digits: List of valid digits for UI/input validation
-        - max_display_digits: Maximum number of digits allowed for display
-        
-        Display Limits (64-bit):
-        - BIN: 64 digits (range: -2^63 to 2^63-1)
-        - OCT: 22 digits (⌈64/3⌉ digits for equivalent range)
-        - DEC: 20 digits (log10(2^64) ≈ 19.3, rounded up)
-        - HEX: 16 digits (⌈64/4⌉ digits for equivalent range)
+        Binds the shared, immutable _BaseConfig record for each supported
+        number base (BIN, OCT, DEC, HEX); see _BASE_CONFIGS for the fields
+        and the 64-bit display limits.
         """
-        self.base_configs = {
-            'BIN': {
-                'valid_digits': '01',
-                'base_int': 2,
-                'available_digits': ['0', '1'],
-                'max_display_digits': 64
-            },
-            'OCT': {
-                'valid_digits': '01234567',
-                'base_int': 8,
-                'available_digits': ['0', '1', '2', '3', '4', '5', '6', '7'],
-                'max_display_digits': 22
-            },
-            'DEC': {
-                'valid_digits': '0123456789',
-                'base_int': 10,
-                'available_digits': ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9'],
-                'max_display_digits': 20
-            },
-            'HEX': {
-                'valid_digits': '0123456789ABCDEF',
-                'base_int': 16,
-                'available_digits': ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 
-                                   'A', 'B', 'C', 'D', 'E', 'F'],
-                'max_display_digits': 16
-            }
-        }
+        self.base_configs = _BASE_CONFIGS
         self.operators = ['+', '-', '*', '/', '(', ')']
         self.functions = ['pow', 'sqrt', 'fact']
 
@@ -83,9 +381,9 @@ class CalculatorModel:
         Raises:
             ValueError: If the base is invalid
         """
-        if base not in self.base_configs:
-            raise ValueError(f"Invalid base: {base}. Must be one of {list(self.base_configs.keys())}")
-        return self.base_configs[base]['available_digits']
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
+        return list(self.base_configs[base].available_digits)  # Copy: the config is shared
 
     def get_operators(self) -> List[str]:
         """Get the list of available operators.
@@ -119,16 +417,16 @@ class CalculatorModel:
         Raises:
             ValueError: If the base is invalid
         """
-        if base not in self.base_configs:
-            raise ValueError(f"Invalid base: {base}. Must be one of {list(self.base_configs.keys())}")
-        return self.base_configs[base]['max_display_digits']
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
+        return self.base_configs[base].max_display_digits
 
-    @lru_cache(maxsize=128)  # Cache results for performance
     def to_decimal(self, number_str: str, base: str) -> int:
         """Convert a number from given base to decimal.
         
         Uses Python's built-in base conversion with additional validation.
-        Results are cached to improve performance for repeated conversions.
+        Results are cached at module level to improve performance for
+        repeated conversions.
         
         Args:
             number_str: The number to convert as a string
@@ -146,40 +444,17 @@ class CalculatorModel:
         if not number_str:
             raise ValueError("Empty number string")
             
-        # Handle negative numbers
-        is_negative = number_str.startswith('-')
-        if is_negative:
-            number_str = number_str[1:]
-            
-        # Validate the number string
-        if base not in self.base_configs:
-            raise ValueError(f"Invalid base: {base}. Must be one of {list(self.base_configs.keys())}")
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
             
-        valid_digits = self.base_configs[base]['valid_digits']
-        if not all(d in valid_digits for d in number_str.upper()):
-            invalid_digits = [d for d in number_str.upper() if d not in valid_digits]
-            raise ValueError(f"Invalid digit(s) {invalid_digits} for {base} number: {number_str}")
-            
-        # Convert based on the base
-        try:
-            if base == 'DEC':
-                result = float(number_str)  # Convert string to float
-            else:
-                base_int = self.base_configs[base]['base_int']
-                number_str = number_str.upper()
-                result = int(number_str, base_int)  # Convert string to int with base
-            return -result if is_negative else result
-            
-        except ValueError:
-            raise ValueError(f"Invalid {base} number: '{number_str}'")
+        return _to_decimal_cached(number_str, base)
 
-    @lru_cache(maxsize=128)  # Cache results for performance
     def from_decimal(self, number: Union[int, float], base: str) -> str:
         """Convert a decimal number to the given base.
         
         Uses Python's built-in conversion functions (hex, oct, bin)
         with additional formatting and validation. Results are cached
-        for performance optimization.
+        at module level for performance optimization.
         
         Args:
             number: Decimal integer or float to convert
@@ -191,45 +466,15 @@ class CalculatorModel:
         Raises:
             ValueError: If number exceeds display limits for target base
         """
-        if not isinstance(number, (int, float)):
+        number_type = type(number)
+        if number_type is not int and number_type is not float and not isinstance(number, (int, float)):
             raise ValueError("Number must be an integer or float")
             
-        if base not in self.base_configs:
-            raise ValueError(f"Invalid base: {base}. Must be one of {list(self.base_configs.keys())}")
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
             
-        if number == 0:
-            return '0'
-            
-        is_negative = number < 0
-        if is_negative:
-            number = -number
-            
-        # For float, skip digit limit check (since it's not representable in non-DEC bases)
-        if isinstance(number, int):
-            max_value = (self.base_configs[base]['base_int'] ** self.base_configs[base]['max_display_digits']) - 1
-            if number > max_value:
-                raise ValueError(f"Number too large for {base} representation with {self.get_max_digits(base)} digits")
-        
-        try:
-            if base == 'DEC':
-                result = str(-number if is_negative else number)
-            elif isinstance(number, float):
-                # For non-DEC bases, return float as string (not representable)
-                result = f"{'-' if is_negative else ''}{number} (non-integer, cannot represent in {base})"
-            elif base == 'HEX':
-                result = hex(number)[2:].upper()  # Convert int to hex string
-                result = f"-{result}" if is_negative else result
-            elif base == 'OCT':
-                result = oct(number)[2:]  # Convert int to octal string
-                result = f"-{result}" if is_negative else result
-            elif base == 'BIN':
-                result = bin(number)[2:]  # Convert int to binary string
-                result = f"-{result}" if is_negative else result
-            return result
-        except Exception as e:
-            raise ValueError(f"Error converting to {base}: {str(e)}")
+        return _from_decimal_cached(number, base)
 
-    @lru_cache(maxsize=128)  # Cache results for performance
     def convert_to_decimal(self, expr: str, base: str) -> str:
         """Convert all numbers in an expression to decimal.
         
@@ -249,43 +494,27 @@ class CalculatorModel:
         Raises:
             ValueError: If any number in the expression is invalid
         """
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
+            
         if base == 'DEC':
-            return expr
+            return expr  # Already decimal: no cache probe, no cache entry
             
-        # Handle unary operators and tokenize the expression
-        expr = re.sub(r'^\s*-\s*', '-', expr)  # Handle unary minus at start
-        expr = re.sub(r'^\s*\+\s*', '', expr)  # Remove unary plus at start
-        expr = re.sub(r'\(\s*-\s*', '(-', expr)  # Handle unary minus after open paren
-        expr = re.sub(r'\(\s*\+\s*', '(', expr)  # Remove unary plus after open paren
-        
-        # Split into tokens preserving operators and parentheses
-        tokens = re.findall(r'(-?[0-9A-Fa-f]+|[\+\-\*\/\(\)])', expr)
-        
-        dec_expr = []
-        for token in tokens:
-            # Loop through each token in the expression to convert numbers to decimal
-            if token in '+-*/()':
-                dec_expr.append(token)
-            else:
-                # Convert number to decimal
-                try:
-                    dec_num = self.to_decimal(token, base)
-                    dec_expr.append(str(dec_num))
-                except ValueError as e:
-                    raise ValueError(f"Error converting '{token}': {str(e)}")
-                
-        return ''.join(dec_expr)
+        return _convert_to_decimal_cached(expr, base)
     
 
     def evaluate_expression(self, expr: str, base: str) -> str:
         """Evaluate a mathematical expression in the given base.
         
         This is the main calculation method that:
-        1. Converts the expression to decimal
-        2. Evaluates the decimal expression
-        3. Converts the result back to the target base
+        1. Tokenizes the expression, converting each number to decimal
+        2. Orders the tokens with the shunting-yard algorithm (RPN);
+           steps 1-2 are cached per (expr, base)
+        3. Evaluates the RPN on a stack
+        4. Converts the result back to the target base
         
-        Security note: Uses restricted eval() for mathematical operations only.
+        Supports +, -, *, /, ^ (or **), prefix √, postfix ! and unary signs.
+        No eval() is involved, so only these operations can ever run.
         
         Args:
             expr: The mathematical expression to evaluate
@@ -297,52 +526,79 @@ class CalculatorModel:
         Raises:
             ValueError: For invalid expressions or results that can't be represented
         """
-        print(f"[TRACE] CalculatorModel.evaluate_expression called with: expr={expr}, base={base}")
-        
-        
-        
-        # First convert the expression to decimal
-        dec_expr = self.convert_to_decimal(expr, base)
-        print(f"[TRACE] Decimal expression: {dec_expr}")
-        # Step 1: Preprocess the expression to replace user symbols
-        # Replace '^' with '**' for exponentiation
-        expr = expr.replace('^', '**')
+        trace = _log.isEnabledFor(logging.DEBUG)  # Checked once; tracing is off by default
+        if trace:
+            _log.debug("evaluate_expression called with: expr=%s, base=%s", expr, base)
         
-        # Replace '√' with 'math.sqrt' including the argument
-        # Use regex to match '√' followed by non-space characters and wrap it properly
-        # Example: '√9' becomes 'math.sqrt(9)'
-        expr = re.sub(r'√(\S+)', r'math.sqrt(\1)', expr)  # \S+ matches one or more non-space characters
-        
-        # Replace '!' for factorial (e.g., '5!' becomes 'math.factorial(5)')
-        expr = re.sub(r'(\d+)!', r'math.factorial(\1)', expr)  # \1 refers to the captured digits group
-        
-        print(f"[TRACE] Preprocessed expression: {expr}")
-        
-        # Step 2: Convert the expression to decimal
-        dec_expr = self.convert_to_decimal(expr, base)
-        print(f"[TRACE] Decimal expression after replacement: {dec_expr}")
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
+            
+        # Parse once per distinct expression; numbers come back already converted to decimal
+        rpn = _compile_expression(expr, base)
+        if trace:
+            _log.debug("RPN: %s", rpn)
 
         try:
-            # Replace multiple unary minuses with a single one
-            dec_expr = re.sub(r'-{2,}', '-', dec_expr)
-            # Replace unary plus followed by minus with just minus
-            dec_expr = re.sub(r'\+-', '-', dec_expr)
-            print(f"[TRACE] Expression before eval: {dec_expr}")
-            # Evaluate the decimal expression
-            safe_dict = {'math': math}  # Dictionary to expose the math module
-            result = eval(dec_expr, {"__builtins__": {}}, safe_dict)  # Secure eval call
-            print(f"[TRACE] Evaluation result: {result}")
-            if not isinstance(result, (int, float)):
-                # Check if the result is a numeric type
+            result = _eval_rpn(rpn)
+            if trace:
+                _log.debug("Evaluation result: %s", result)
+            result_type = type(result)
+            if result_type is not int and result_type is not float:
+                # Check if the result is a numeric type (e.g. not complex)
                 raise ValueError("Expression resulted in a non-numeric value")
-            # Convert the result back to the target base
-            final_result = self.from_decimal(result, base)
-            print(f"[TRACE] Final result in base {base}: {final_result}")
+            # Convert the result back to the target base; base and type are already checked
+            final_result = _from_decimal_cached(result, base)
+            if trace:
+                _log.debug("Final result in base %s: %s", base, final_result)
             return final_result
         except ZeroDivisionError:
             # Handle division by zero
             raise ValueError("Division by zero")
         except Exception as e:
             # Handle any other evaluation error
-            raise ValueError(f"Error evaluating expression: {str(e)}") 
-        
\ No newline at end of file
+            raise ValueError(f"Error evaluating expression: {str(e)}")
+
+    def evaluate_expression_bases(self, expr: str, base: str, bases: Iterable[str]) -> Dict[str, str]:
+        """Evaluate an expression once and return the result in several bases.
+        
+        Lets a client fetch every base display in one request instead of
+        converting (or asking again) when the user switches base.
+        
+        Args:
+            expr: The mathematical expression to evaluate
+            base: The number base the expression is written in
+            bases: The bases to return the result in
+            
+        Returns:
+            Dictionary mapping each requested base to the result in that base;
+            bases that can't hold the result (too many digits) map to 'Err'
+            
+        Raises:
+            ValueError: For invalid bases, invalid expressions or a result that
+                        can't be represented in `base` itself
+        """
+        if base not in _VALID_BASES:
+            raise ValueError(f"Invalid base: {base}. {_BASE_ERR}")
+        for out_base in bases:
+            if out_base not in _VALID_BASES:
+                raise ValueError(f"Invalid base: {out_base}. {_BASE_ERR}")
+        
+        rpn = _compile_expression(expr, base)
+        try:
+            result = _eval_rpn(rpn)
+            result_type = type(result)
+            if result_type is not int and result_type is not float:
+                raise ValueError("Expression resulted in a non-numeric value")
+            values = {base: _from_decimal_cached(result, base)}  # Same errors as evaluate_expression
+        except ZeroDivisionError:
+            raise ValueError("Division by zero")
+        except Exception as e:
+            raise ValueError(f"Error evaluating expression: {str(e)}")
+        
+        for out_base in bases:
+            if out_base not in values:
+                try:
+                    values[out_base] = _from_decimal_cached(result, out_base)
+                except ValueError:
+                    values[out_base] = 'Err'
+        return values
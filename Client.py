@@ -1,8 +1,61 @@
-import json  # For JSON serialization/deserialization
 import socket  # For network communication
+import re
 import time  # For retry delays
 import threading
+import queue  # Hands calculations to the background worker
+from collections import OrderedDict  # LRU cache of calculation results
 import logging  # For logging events and data
+import logging.handlers  # QueueHandler/QueueListener keep file writes off the caller's thread
+import atexit
+from functools import lru_cache, partial
+from NetUtils import send_frame, recv_frame, encode_message, decode_message
+
+try:
+    import numpy as np  # Optional: integer matrix operations are then computed locally
+except ImportError:
+    np = None
+
+# Calculator requests only vary in expr and base, so they are encoded by filling this
+# template; encode_message() still does the JSON string escaping of the two values
+_CALC_REQUEST = b'{"model":"calculator","instructions":{"expr":%s,"base":%s,"bases":["BIN","OCT","DEC","HEX"]}}'
+
+_INT_RE = re.compile(r'[+-]?\d+')
+_PLAIN_NUMBER_RE = re.compile(r'-?[0-9A-F]+')  # A lone number in any base, no operators
+_BASE_RADIX = {'BIN': 2, 'OCT': 8, 'DEC': 10, 'HEX': 16}
+_BASE_FORMAT = {'BIN': 'b', 'OCT': 'o', 'DEC': 'd', 'HEX': 'X'}  # format() handles the sign itself
+# The server's 64-bit display limits (digits per base); larger magnitudes show 'Err'
+_BASE_MAX_VALUE = {code: _BASE_RADIX[code] ** digits - 1
+                   for code, digits in {'BIN': 64, 'OCT': 22, 'DEC': 20, 'HEX': 16}.items()}
+_FLOAT_EXACT = 2 ** 53  # Integers below this magnitude are exact in float64
+
+@lru_cache(maxsize=64)
+def _parse_int_matrix(text):
+    """Parse '[1,2;3,4]' for local NumPy arithmetic (requires NumPy).
+    
+    Cached by the literal text, so re-running an operation (or switching
+    between add/subtract/multiply) on unchanged inputs skips the parse.
+    
+    Returns:
+        (read-only float64 array, largest absolute element), or None unless
+        the text is a plain rectangular integer matrix
+    """
+    text = text.strip()
+    if not (text.startswith('[') and text.endswith(']')):
+        return None
+    rows = []
+    for row in text[1:-1].split(';'):
+        cells = [cell.strip() for cell in row.split(',')]
+        if not all(_INT_RE.fullmatch(cell) for cell in cells):
+            return None
+        rows.append([int(cell) for cell in cells])
+    if any(len(row) != len(rows[0]) for row in rows):
+        return None
+    max_abs = max(abs(x) for row in rows for x in row)  # From the exact ints, before float conversion
+    if max_abs >= _FLOAT_EXACT:
+        return None
+    matrix = np.array(rows, dtype=np.float64)
+    matrix.flags.writeable = False  # Shared between calls through the cache
+    return matrix, max_abs
 
 class MathClientController:
     """Controller for the View. Handles all server communication and UI updates."""
@@ -14,24 +67,40 @@ class MathClientController:
         self.response_timeout = 10
         self.max_retries = 1  # Reduced for faster feedback
         self.retry_delay = 0.1  # Reduced for faster feedback
+        self._sock = None  # Persistent connection, reused across requests
+        self._sock_last_used = 0.0  # time.monotonic() of the last completed exchange
+        self.idle_timeout = 30  # Seconds before an unused connection is dropped
+        self._pending_calc_id = 0  # Bumped per calculation; older results are discarded
+        self._calc_debounce_ms = 80  # Repeated '=' presses within this window send one request
+        self._last_base_values = None  # Last result in every base, reused when the base changes
+        self._calc_cache = OrderedDict()  # (expr, base) -> result in every base, least recently used first
+        self._calc_cache_size = 512
+        self._solve_cache = OrderedDict()  # Whitespace-free equation -> solver output, LRU order
+        self._solve_cache_size = 128
+        self._conn_lock = threading.Lock()  # One request/response exchange at a time
+        self._work_q = queue.Queue()  # Background jobs, run in FIFO order by one worker thread
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._worker.start()
         self.logger = logging.getLogger('MathClient')
         self.logger.setLevel(logging.INFO)  # Set logging level
         handler = logging.FileHandler('logs/client.log')  # Changed to relative path
         handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(handler)
+        # Callers only enqueue records; the listener thread formats and writes them to the file
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._log_listener = logging.handlers.QueueListener(log_queue, handler)
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)  # Flush queued records on exit
+        atexit.register(self.close)  # Runs before the listener stops (LIFO), so its records are flushed
         # Wire up UI events
-        if hasattr(view, 'calc_buttons'):
-            for key, btn in view.calc_buttons.items():
-                if key == '=':
-                    btn.configure(command=self.on_calculate)
-                elif key in ['CE']:
-                    btn.configure(command=self.on_calc_clear)
-                elif key in ['⌫']:
-                    btn.configure(command=self.on_calc_backspace)
-                elif key in ['BIN', 'OCT', 'DEC', 'HEX']:
-                    btn.configure(command=lambda b=key: self.on_base_change(b))
-                else:
-                    btn.configure(command=lambda k=key: self.on_calc_button_press(k))
+        if hasattr(view, 'calc_equal_button'):
+            view.calc_equal_button.configure(command=self.on_calculate)
+            view.calc_clear_button.configure(command=self.on_calc_clear)
+            view.calc_backspace_button.configure(command=self.on_calc_backspace)
+            for base, btn in view.calc_base_buttons:
+                btn.configure(command=partial(self.on_base_change, base))
+            for key, btn in view.calc_key_buttons:
+                btn.configure(command=partial(self.on_calc_button_press, key))
         if hasattr(view, 'solve_button'):
             view.solve_button.configure(command=self.on_solve)
         if hasattr(view, 'plot_button'):
@@ -49,6 +118,9 @@ class MathClientController:
             view.solver_nav_button.configure(command=view.show_solver)
         if hasattr(view, 'matrix_nav_button'):
             view.matrix_nav_button.configure(command=view.show_matrix)
+        # Disconnect as soon as the window closes rather than at interpreter exit
+        if hasattr(view, 'root'):
+            view.root.protocol("WM_DELETE_WINDOW", self.on_window_close)
 
     def is_server_running(self):
         try:
@@ -57,118 +129,252 @@ class MathClientController:
         except Exception:
             return False
 
-    def update_server_status(self):
-        if self.is_server_running():
+    def update_server_status(self, online=None):
+        """Show the server status, probing the server only when the caller doesn't already know it."""
+        if online is None:
+            online = self.is_server_running()
+        if online:
             self.view.set_server_status('Online', color='green')
         else:
             self.view.set_server_status('Offline', color='red')
 
-    def send_request(self, request_dict):
-        self.logger.info(f'Sending request: {request_dict}')  # Log the request
-        self.update_server_status()  # Update status before sending
+    def _get_conn(self):
+        """Return the cached server connection, connecting first if there is none."""
+        if self._sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connection_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Don't delay small requests
+            sock.settimeout(self.response_timeout)
+            self._sock = sock
+        return self._sock
+
+    def _drop_stale_conn(self):
+        """Close the cached connection if it sat idle too long or the server hung up."""
+        if self._sock is None:
+            return
+        if time.monotonic() - self._sock_last_used > self.idle_timeout:
+            self._close_conn()
+            return
+        # Health check: a live, idle connection has nothing to read. EOF means the
+        # peer closed it; stray bytes would desynchronize the framing. Either way drop it.
+        self._sock.setblocking(False)
+        try:
+            self._sock.recv(1, socket.MSG_PEEK)
+            healthy = False
+        except BlockingIOError:
+            healthy = True
+        except OSError:
+            healthy = False
+        if healthy:
+            self._sock.settimeout(self.response_timeout)
+        else:
+            self._close_conn()
+
+    def on_window_close(self):
+        self.close()
+        self.view.root.destroy()
+
+    def close(self):
+        """Disconnect from the server: the explicit, graceful counterpart of _close_conn."""
+        with self._conn_lock:
+            if self._sock is not None:
+                try:
+                    self._sock.shutdown(socket.SHUT_RDWR)  # Tell the server we're done before closing
+                except OSError:
+                    pass  # Peer already gone
+            self._close_conn()
+
+    def _close_conn(self):
+        """Close the cached connection without a shutdown() handshake; safe on error paths."""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _exchange(self, request_data):
+        """Send one framed request on the persistent connection and return the framed reply.
+        
+        A failure on a reused connection (e.g. the server restarted) is retried
+        once on a fresh connection; a failure on a fresh one is raised.
+        """
+        with self._conn_lock:
+            self._drop_stale_conn()
+            for reused in (self._sock is not None, False):
+                sock = self._get_conn()
+                try:
+                    send_frame(sock, request_data)
+                    response = recv_frame(sock)
+                    if response is None:
+                        raise ConnectionError("Server closed the connection")
+                    self._sock_last_used = time.monotonic()
+                    return response
+                except ConnectionError:
+                    # The server dropped the connection; only then is resending safe
+                    self._close_conn()
+                    if not reused:
+                        raise
+                except Exception:
+                    # Timeouts included: the server may still be running the request
+                    self._close_conn()
+                    raise
+
+    def send_request(self, request_dict, request_data=None):
+        """Send a request and return the decoded response (or an {"error": ...} dict).
+        
+        request_data may carry request_dict already encoded, for hot paths
+        that build their payload from a template.
+        """
+        self.logger.info('Sending request: %r', request_dict)  # Log the request
+        if request_data is None:
+            request_data = encode_message(request_dict)
         retries = 0
         last_exception = None
         start = time.time()
         while retries < self.max_retries:
             try:
-                with socket.create_connection((self.host, self.port), timeout=self.connection_timeout) as sock:
-                    sock.settimeout(self.response_timeout)
-                    request_data = json.dumps(request_dict).encode('utf-8')
-                    sock.sendall(request_data)
-                    sock.shutdown(socket.SHUT_WR)
-                    response = b""
-                    while True:
-                        chunk = sock.recv(4096)
-                        if not chunk:
-                            break
-                        response += chunk
-                    received_response = json.loads(response.decode('utf-8'))
-                    self.logger.info(f'Received response: {received_response}')  # Log the response
-                    self.update_server_status()  # Update status after successful response
-                    print(f"Request/response roundtrip: {time.time() - start:.3f} seconds")
-                    return received_response
+                response = self._exchange(request_data)
+                received_response = decode_message(response)
+                self.logger.info('Received response: %r', received_response)  # Log the response
+                self.update_server_status(True)  # The exchange itself proves the server is up
+                print(f"Request/response roundtrip: {time.time() - start:.3f} seconds")
+                return received_response
             except Exception as e:
                 last_exception = str(e)
-                self.logger.error(f'Error in send_request: {e}')  # Log the error
+                self.logger.error('Error in send_request: %s', e)  # Log the error
                 retries += 1
                 time.sleep(self.retry_delay)
-        self.update_server_status()  # Update status after failure
+        self.update_server_status(False)  # Every attempt failed; no need to probe again
         print(f"Request failed after {time.time() - start:.3f} seconds")
         error_response = {"error": f"Server is offline or unreachable. Failed to connect after {self.max_retries} attempts. Last error: {last_exception}"}
-        self.logger.error(f'Request failed: {error_response}')  # Log the failure
+        self.logger.error('Request failed: %s', error_response)  # Log the failure
         return error_response
 
+    def _drain(self):
+        """Run queued background jobs one at a time for the life of the client."""
+        while True:
+            job = self._work_q.get()
+            try:
+                job()
+            except Exception:
+                self.logger.exception('Background job failed')
+
     def on_calculate(self):
         expr = self.view.get_calc_entry()
         base = getattr(self.view, 'current_base', 'DEC')
-        self.logger.info(f'Calculating expression: {expr} in base {base}')  # Log calculate event
+        self.logger.info('Calculating expression: %s in base %s', expr, base)  # Log calculate event
+        self._pending_calc_id += 1
+        calc_id = self._pending_calc_id
+        self.view.root.after(self._calc_debounce_ms, lambda: self._start_calculation(calc_id, expr, base))
+
+    def _start_calculation(self, calc_id, expr, base):
+        if calc_id != self._pending_calc_id:
+            return  # Superseded during the debounce window
+        key = (expr, base)
+        cached = self._calc_cache.get(key)
+        if cached is not None:
+            # Evaluation is deterministic, so a repeat needs no round trip
+            self._calc_cache.move_to_end(key)
+            self._show_calc_result(cached, base)
+            return
         def worker():
-            request = {"model": "calculator", "instructions": {"expr": expr, "base": base}}
-            response = self.send_request(request)
+            # The server renders the result in every base at once, so switching base needs no request
+            request = {"model": "calculator", "instructions": {"expr": expr, "base": base, "bases": ['BIN', 'OCT', 'DEC', 'HEX']}}
+            response = self.send_request(request, _CALC_REQUEST % (encode_message(expr), encode_message(base)))
             def update_ui():
+                if calc_id != self._pending_calc_id:
+                    return  # A newer calculation or a clear happened; don't overwrite it
                 if "result" in response:
-                    self.logger.info(f'Calculation result: {response["result"]}')  # Log result
-                    result = response["result"]
-                    try:
-                        if base == 'DEC':
-                            dec_value = int(float(result))
-                        else:
-                            dec_value = int(result, {'BIN': 2, 'OCT': 8, 'HEX': 16}[base])
-                        base_values = {
-                            'BIN': bin(dec_value)[2:] if dec_value >= 0 else '-' + bin(-dec_value)[2:],
-                            'OCT': oct(dec_value)[2:] if dec_value >= 0 else '-' + oct(-dec_value)[2:],
-                            'DEC': str(dec_value),
-                            'HEX': hex(dec_value)[2:].upper() if dec_value >= 0 else '-' + hex(-dec_value)[2:].upper()
-                        }
-                    except Exception:
-                        base_values = {'BIN': 'Err', 'OCT': 'Err', 'DEC': str(result), 'HEX': 'Err'}
-                    self.view.set_base_displays(base_values)
-                    self.view.set_calc_display(str(result))
+                    self.logger.info('Calculation result: %s', response["result"])  # Log result
+                    base_values = response["result"]
+                    self._calc_cache[key] = base_values
+                    if len(self._calc_cache) > self._calc_cache_size:
+                        self._calc_cache.popitem(last=False)  # Evict the least recently used result
+                    self._show_calc_result(base_values, base)
                 else:
-                    self.logger.error(f'Calculation error: {response.get("error", "Unknown error")}')  # Log error
+                    self._last_base_values = None
+                    self.logger.error('Calculation error: %s', response.get("error", "Unknown error"))  # Log error
                     self.view.set_calc_display(f"Error: {response.get('error', 'Unknown error')}")
                     self.view.set_base_displays({'BIN': '', 'OCT': '', 'DEC': '', 'HEX': ''})
             self.view.root.after(0, update_ui)
-        threading.Thread(target=worker, daemon=True).start()
+        self._work_q.put(worker)
+
+    def _show_calc_result(self, base_values, base):
+        self._last_base_values = base_values
+        self.view.set_base_displays(base_values)
+        self.view.set_calc_display(base_values[base])
 
     def on_solve(self):
         equation = self.view.get_solver_entry()
-        self.logger.info(f'Solving equation: {equation}')  # Log solve event
+        self.logger.info('Solving equation: %s', equation)  # Log solve event
+        key = ''.join(equation.split())  # Spacing doesn't change the equation
+        cached = self._solve_cache.get(key)
+        if cached is not None:
+            self._solve_cache.move_to_end(key)
+            self.view.set_solver_output(cached)
+            return
         request = {"model": "solver", "instructions": {"equation": equation}}
         response = self.send_request(request)
         if "result" in response:
-            self.logger.info(f'Solve result: {response["result"]}')  # Log result
+            self.logger.info('Solve result: %s', response["result"])  # Log result
+            self._solve_cache[key] = response["result"]
+            if len(self._solve_cache) > self._solve_cache_size:
+                self._solve_cache.popitem(last=False)
             self.view.set_solver_output(response["result"])
         else:
-            self.logger.error(f'Solve error: {response.get("error", "Unknown error")}')  # Log error
+            self.logger.error('Solve error: %s', response.get("error", "Unknown error"))  # Log error
             self.view.set_solver_output(f"Error: {response.get('error', 'Unknown error')}")
 
     def on_matrix_add(self):
-        m1, m2 = self.view.get_matrix_values()
-        request = {"model": "matrix", "instructions": {"operation": "add", "matrix1": m1, "matrix2": m2}}
-        response = self.send_request(request)
-        if "result" in response:
-            self.view.display_matrix_result(response["result"])
-        else:
-            self.view.show_matrix_error(response.get('error', 'Unknown error'))
+        self._run_matrix_operation("add")
+
     def on_matrix_subtract(self):
-        m1, m2 = self.view.get_matrix_values()
-        request = {"model": "matrix", "instructions": {"operation": "subtract", "matrix1": m1, "matrix2": m2}}
-        response = self.send_request(request)
-        if "result" in response:
-            self.view.display_matrix_result(response["result"])
-        else:
-            self.view.show_matrix_error(response.get('error', 'Unknown error'))
+        self._run_matrix_operation("subtract")
 
     def on_matrix_multiply(self):
+        self._run_matrix_operation("multiply")
+
+    def _run_matrix_operation(self, operation):
         m1, m2 = self.view.get_matrix_values()
-        request = {"model": "matrix", "instructions": {"operation": "multiply", "matrix1": m1, "matrix2": m2}}
+        result = self._local_matrix_operation(operation, m1, m2)
+        if result is not None:
+            self.view.display_matrix_result(result)
+            return
+        request = {"model": "matrix", "instructions": {"operation": operation, "matrix1": m1, "matrix2": m2}}
         response = self.send_request(request)
         if "result" in response:
             self.view.display_matrix_result(response["result"])
         else:
             self.view.show_matrix_error(response.get('error', 'Unknown error'))
 
+    def _local_matrix_operation(self, operation, m1, m2):
+        """Compute an integer matrix operation with NumPy, matching the server's float results.
+        
+        Returns None whenever the server should handle it instead: NumPy is
+        missing, an element isn't a plain integer (symbolic or decimal input),
+        the shapes don't fit (the server reports the error), or the result
+        could exceed float64's exact integer range.
+        """
+        if np is None:
+            return None
+        parsed_a = _parse_int_matrix(m1)
+        parsed_b = _parse_int_matrix(m2)
+        if parsed_a is None or parsed_b is None:
+            return None
+        a, max_a = parsed_a
+        b, max_b = parsed_b
+        if operation == "multiply":
+            if a.shape[1] != b.shape[0] or max_a * max_b * b.shape[0] >= _FLOAT_EXACT:
+                return None
+            result = a @ b
+        elif operation in ("add", "subtract"):
+            if a.shape != b.shape or max_a + max_b >= _FLOAT_EXACT:
+                return None
+            result = a + b if operation == "add" else a - b
+        else:
+            return None
+        return (result + 0.0).tolist()  # + 0.0 turns -0.0 into 0.0, as the server's results have it
+
     def on_plot(self):
         equation = self.view.get_solver_entry()
         request = {"model": "plotter", "instructions": {"equation": equation}}
@@ -179,28 +385,47 @@ class MathClientController:
             self.view.set_solver_output(f"Error: {response.get('error', 'Unknown error')}")
 
     def on_calc_button_press(self, key):
-        if key == '√':
-            entry = self.view.get_calc_entry() + '√'  
-            self.view.set_calc_display(entry)
-        elif key == '^':
-            entry = self.view.get_calc_entry() + '^'  
-            self.view.set_calc_display(entry)
-        elif key == '!':
-            entry = self.view.get_calc_entry() + '!'  
-            self.view.set_calc_display(entry)
-        else:
-            entry = self.view.get_calc_entry() + key  
-            self.view.set_calc_display(entry)
+        # Digits the current base can't use have their buttons disabled by the view,
+        # so every key that reaches here is appended as-is
+        self.view.append_calc_text(key)
 
     def on_calc_clear(self):
+        self._pending_calc_id += 1  # Drop any in-flight result
         self.view.set_calc_display("")
 
     def on_calc_backspace(self):
-        entry = self.view.get_calc_entry()
-        self.view.set_calc_display(entry[:-1])
+        self.view.delete_calc_last_char()
 
     def on_base_change(self, base):
+        old_base = self.view.current_base
+        if base == old_base:
+            return  # Nothing to convert; keep the entry and displays as they are
+        self._pending_calc_id += 1  # Drop any in-flight result for the old base
+        values = self._last_base_values
+        self._last_base_values = None
         self.view._update_button_states(base)
-        # Clear all fields when switching base
+        if values and self.view.get_calc_entry() == values[old_base] and values[base] != 'Err' and '(' not in values[base]:
+            # The display still shows the last result and it fits the new base: reuse it
+            self._last_base_values = values
+            self.view.set_calc_display(values[base])
+            self.view.set_base_displays(values)
+            return
+        entry = self.view.get_calc_entry().strip()
+        if _PLAIN_NUMBER_RE.fullmatch(entry):
+            # A single number needs no evaluation: convert it here instead of asking the server
+            try:
+                number = int(entry, _BASE_RADIX[old_base])
+            except ValueError:
+                pass  # Digits not valid in the old base; clear as below
+            else:
+                values = {code: format(number, spec) if abs(number) <= _BASE_MAX_VALUE[code] else 'Err'
+                          for code, spec in _BASE_FORMAT.items()}
+                if values[base] != 'Err':
+                    self._last_base_values = values
+                    self.view.set_calc_display(values[base])
+                    self.view.set_base_displays(values)
+                    return
+                # Too large for the new base; clear as below
+        # Otherwise clear all fields when switching base
         self.view.set_calc_display("")
         self.view.set_base_displays({'BIN': '', 'OCT': '', 'DEC': '', 'HEX': ''})
@@ -1,77 +1,190 @@
 import socket
 import json
-from SolverModel import SolverModel
+import os
 from CalculatorModel import CalculatorModel
-from PlotterModel import PlotterModel
 from MatrixModel import MatrixModel
 from ModelUtils import handle_model_request
+from NetUtils import send_frame, recv_frame, encode_message, decode_message, MAX_MESSAGE_SIZE
 import threading
+import queue
 import time
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _shared_model(model_cls):
+    """Return the process-wide instance of a model class, creating it on first use.
+    
+    The models keep no per-request state (MatrixModel only caches SymPy
+    symbols), so every Controller can share one of each.
+    """
+    return model_cls()
 
 class Controller:
     """Controller for mathematical models, handling JSON requests and data formatting."""
-    def __init__(self, client_host='localhost', client_port=12345):
-        self.calc_model = CalculatorModel()
-        self.solver_model = SolverModel()
-        self.plotter_model = PlotterModel()
-        self.matrix_model = MatrixModel()
+    def __init__(self, client_host='localhost', client_port=12345, max_connections=32, idle_timeout=60):
+        self.calc_model = _shared_model(CalculatorModel)
+        self.matrix_model = _shared_model(MatrixModel)
         self.client_host = client_host
         self.client_port = client_port
+        self._client_sock = None  # Persistent framed connection used by send_to_client
+        self._client_lock = threading.Lock()
+        # Accepted connections are served by a fixed set of reused worker threads;
+        # beyond max_connections concurrent clients, new ones wait for a free worker
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout  # Seconds a connection may wait between requests before it frees its worker
+        self._conn_q = queue.Queue()
+        self._workers = []
 
-    def process_json_request(self, json_str: str) -> str:
+    # SolverModel and PlotterModel pull in matplotlib; import them on first solve/plot
+    # so a server that only ever calculates never pays for it
+
+    @property
+    def solver_model(self):
+        from SolverModel import SolverModel
+        return _shared_model(SolverModel)
+
+    @property
+    def plotter_model(self):
+        from PlotterModel import PlotterModel
+        return _shared_model(PlotterModel)
+
+    def process_request_data(self, request_data: bytes) -> bytes:
+        """Decode one request payload, run it and return the encoded reply.
+        
+        Results go to the encoder as-is, so NumPy arrays are serialized in a
+        single pass (natively when orjson is installed).
+        """
         try:
-            data = json.loads(json_str)
+            data = decode_message(request_data)
             model_name = data.get("model")
             instructions = data.get("instructions", {})
             result = handle_model_request(self, model_name, instructions)
-            return json.dumps({"result": result})
+            return encode_message({"result": result})
         except Exception as e:
-            return json.dumps({"error": str(e)})
+            return encode_message({"error": str(e)})
+
+    def process_json_request(self, json_str: str) -> str:
+        return self.process_request_data(json_str.encode('utf-8')).decode('utf-8')
 
     def send_to_client(self, json_str: str) -> str:
-        """Send a JSON string to the client over TCP and return the response as a string."""
+        """Send a JSON string to the client over TCP and return the response as a string.
+        
+        Uses the same length-prefixed framing as handle_client over one
+        connection kept open between calls; a reused connection the client has
+        closed is replaced once, and any other failure discards the connection.
+        """
+        payload = json_str.encode('utf-8')
         try:
-            with socket.create_connection((self.client_host, self.client_port), timeout=10) as sock:
-                sock.sendall(json_str.encode('utf-8'))
-                sock.shutdown(socket.SHUT_WR)
-                response = b""
-                while True:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-                return response.decode('utf-8')
+            with self._client_lock:
+                for reused in (self._client_sock is not None, False):
+                    if self._client_sock is None:
+                        sock = socket.create_connection((self.client_host, self.client_port), timeout=10)
+                        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        self._client_sock = sock
+                    try:
+                        send_frame(self._client_sock, payload)
+                        response = recv_frame(self._client_sock)
+                        if response is None:
+                            raise ConnectionError("Connection closed by peer")
+                        return response.decode('utf-8')
+                    except ConnectionError:
+                        # The client dropped the connection; only then is resending safe
+                        self._client_sock.close()
+                        self._client_sock = None
+                        if not reused:
+                            raise
+                    except Exception:
+                        # Timeouts and oversized replies leave the stream mid-frame: never reuse it
+                        self._client_sock.close()
+                        self._client_sock = None
+                        raise
         except Exception as e:
             return json.dumps({"error": str(e)})
 
     def handle_client(self, conn, addr):
+        """Serve length-prefixed JSON requests on one connection until the client closes it
+        or leaves it idle for idle_timeout seconds."""
         with conn:
             print(f"Connected by {addr}")
-            start = time.time()
-            data = b""
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Small replies go out immediately
+            conn.settimeout(self.idle_timeout)  # An idle client must not hold a pooled worker forever
             while True:
-                chunk = conn.recv(4096)
-                if not chunk:
+                try:
+                    data = recv_frame(conn)
+                except ValueError as e:
+                    # Oversized frame: the stream can't be resynced, so reply and close
+                    try:
+                        send_frame(conn, encode_message({"error": str(e)}))
+                    except OSError:
+                        pass
                     break
-                data += chunk
-            print(f"Received data in {time.time() - start:.3f} seconds")
-            if data:
-                request_str = data.decode('utf-8')
-                response_str = self.process_json_request(request_str)
-                print(f"Processed request in {time.time() - start:.3f} seconds")
-                conn.sendall(response_str.encode('utf-8'))
-            print(f"Total handle_client time: {time.time() - start:.3f} seconds")
+                except socket.timeout:
+                    print(f"Closing idle connection {addr}")
+                    break
+                except OSError:
+                    break  # Broken connection
+                if data is None:
+                    break  # Client disconnected
+                start = time.time()
+                response_data = self.process_request_data(data)
+                try:
+                    send_frame(conn, response_data)
+                except OSError:
+                    break
+                print(f"Handled request in {time.time() - start:.3f} seconds")
+            print(f"Disconnected {addr}")
 
-    def run_server(self, host='0.0.0.0', port=12345):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_sock:
-            server_sock.bind((host, port))
-            server_sock.listen()
-            print(f"Controller server listening on {host}:{port}")
-            while True:
-                conn, addr = server_sock.accept()
-                client_thread = threading.Thread(target=self.handle_client, args=(conn, addr), daemon=True)
-                client_thread.start()
+    def _listen(self, host, port, reuse_port=False):
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Restart without waiting out TIME_WAIT
+        # Accepted connections inherit these: room for a whole maximum-size frame per direction
+        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MAX_MESSAGE_SIZE)
+        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, MAX_MESSAGE_SIZE)
+        if reuse_port:
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)  # Must be set before bind
+        server_sock.bind((host, port))
+        server_sock.listen()
+        return server_sock
+
+    def _accept_loop(self, server_sock):
+        while True:
+            conn, addr = server_sock.accept()
+            self._conn_q.put((conn, addr))
+
+    def _connection_worker(self):
+        while True:
+            conn, addr = self._conn_q.get()
+            try:
+                self.handle_client(conn, addr)
+            except Exception as e:  # Keep the worker alive for the next connection
+                print(f"Error handling {addr}: {e}")
+
+    def run_server(self, host='0.0.0.0', port=12345, acceptors=1):
+        """Accept clients forever, serving each connection on a pooled worker thread.
+        
+        With acceptors > 1 and SO_REUSEPORT support, that many listening sockets
+        share the port and the kernel spreads new connections across their
+        accept loops instead of queueing them all on one socket.
+        """
+        reuse_port = acceptors > 1 and hasattr(socket, 'SO_REUSEPORT')
+        server_socks = [self._listen(host, port, reuse_port) for _ in range(acceptors if reuse_port else 1)]
+        print(f"Controller server listening on {host}:{port} ({len(server_socks)} acceptor(s))")
+        while len(self._workers) < self.max_connections:
+            # Daemon threads (unlike a ThreadPoolExecutor's) don't block interpreter exit on idle clients
+            worker = threading.Thread(target=self._connection_worker, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        try:
+            for server_sock in server_socks[1:]:
+                threading.Thread(target=self._accept_loop, args=(server_sock,), daemon=True).start()
+            self._accept_loop(server_socks[0])
+        finally:
+            for server_sock in server_socks:
+                server_sock.close()
 
 if __name__ == "__main__":
     controller = Controller()
-    controller.run_server(host='0.0.0.0', port=12345)
\ No newline at end of file
+    # SO_REUSEPORT acceptors are opt-in: with them a second server on the port
+    # would bind silently and share clients instead of failing with EADDRINUSE
+    acceptors = int(os.environ.get("CONTROLLER_ACCEPTORS", "1"))
+    controller.run_server(host='0.0.0.0', port=12345, acceptors=acceptors)
\ No newline at end of file
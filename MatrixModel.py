@@ -1,9 +1,108 @@
+import ast  # literal_eval for all-numeric rows
+import math
 import numpy as np
+import logging  # For optional debug tracing
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any, Union
 import sympy as sp
 from sympy import Matrix, Symbol, sympify
 from ModelUtils import validate_input, FUNCTIONS
 
+_log = logging.getLogger(__name__)
+
+_FLOAT_EXACT = 2 ** 53  # Integers below this magnitude are exact in float64
+
+def _as_float_array(matrix: List[List[Any]]):
+    """Convert a purely numeric matrix for the NumPy fast path.
+    
+    Only plain ints and floats (Python or SymPy Integer/Float) qualify;
+    symbols, rationals and unparsed strings keep the exact SymPy path.
+    
+    Returns:
+        (float64 array, largest magnitude if every element is an integer else None),
+        or None if any element isn't numeric or an integer isn't exact as a float
+    """
+    if isinstance(matrix, np.ndarray) and matrix.dtype == np.float64:
+        return matrix, None  # A previous fast-path result: already in the packed form
+    max_int = 0
+    all_int = True
+    for row in matrix:
+        for element in row:
+            if isinstance(element, (int, sp.Integer)):
+                max_int = max(max_int, abs(int(element)))
+            elif isinstance(element, (float, sp.Float)):
+                all_int = False
+            else:
+                return None
+    if max_int >= _FLOAT_EXACT:
+        return None  # Not exact (or not even finite) as float64; SymPy keeps the baseline result
+    try:
+        array = np.array(matrix, dtype=np.float64)
+    except OverflowError:
+        return None  # e.g. a SymPy Float beyond the float64 range
+    return array, (max_int if all_int else None)
+
+def _parse_numeric_row(row: str):
+    """Parse a row such as '1, -2.5, 3' in one literal_eval call.
+    
+    Returns:
+        List of Python ints/floats, or None if any element isn't a plain finite number
+    """
+    try:
+        values = ast.literal_eval('(' + row + ',)')
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None  # Symbolic or malformed: parse element by element
+    if not isinstance(values, tuple):
+        return None
+    for value in values:
+        # Booleans, complex numbers, strings etc. keep the sympify path
+        if type(value) is float:
+            if not math.isfinite(value):
+                return None
+        elif type(value) is not int:
+            return None
+    return list(values)
+
+@lru_cache(maxsize=4096)
+def _parse_element_cached(element: str):
+    """sympify one matrix cell; cached because cells like '0', '1' and 'x' repeat constantly.
+    
+    Safe to share: SymPy expressions are immutable, as is the string fallback.
+    """
+    try:
+        return sp.sympify(element, locals=FUNCTIONS)
+    except Exception:
+        return element  # fallback: return as string if cannot parse
+
+def _str_to_native(element: str):
+    """A numeric string becomes a float; anything else (e.g. 'x+1') is kept as is."""
+    try:
+        return float(element)
+    except ValueError:
+        return element
+
+# Exact-type converters for ensure_native_types: one dict lookup per element
+# instead of the isinstance ladder. Subclasses and SymPy types take the ladder.
+_NATIVE_CONVERTERS = {
+    float: float,
+    int: float,
+    bool: float,
+    type(None): lambda _: 0.0,
+    str: _str_to_native,
+    np.float64: float,
+    np.float32: float,
+    np.int64: float,
+    np.int32: float,
+}
+
+@lru_cache(maxsize=2048)
+def _cached_simplify(expr: sp.Basic) -> sp.Basic:
+    """sp.simplify memoized across results; the same cell expressions recur between operations.
+    
+    Exceptions are not cached, so callers keep their own fallback.
+    """
+    return sp.simplify(expr)
+
 class MatrixModel:
     """A model class for matrix operations and symbolic matrix manipulation.
     
@@ -68,10 +167,7 @@ class MatrixModel:
         return self.symbols[name]
     
     def parse_element(self, element: str):
-        try:
-            return sp.sympify(element, locals=FUNCTIONS)
-        except Exception:
-            return element  # fallback: return as string if cannot parse
+        return _parse_element_cached(element)
     
     def parse_matrix_input(self, matrix_text: str) -> List[List[Any]]:
         """Parse a matrix from text input, supporting both numeric and symbolic elements.
@@ -117,7 +213,9 @@ class MatrixModel:
         for row in rows:
             # Loop through each row string to parse its elements
             try:
-                elements = [self.parse_element(x.strip()) for x in row.split(',')]
+                elements = _parse_numeric_row(row)  # Whole row at once when it's all numbers
+                if elements is None:
+                    elements = [self.parse_element(x.strip()) for x in row.split(',')]
                 matrix.append(elements)
             except ValueError as e:
                 # If parsing an element fails, raise a detailed error for this row
@@ -139,6 +237,11 @@ class MatrixModel:
         # Convert all elements to SymPy format
         return matrix  # Elements are already parsed as SymPy objects
     def validate_matrix(self, matrix):
+        if isinstance(matrix, np.ndarray):
+            # Results of a numeric operation can be fed straight back in
+            if matrix.ndim != 2:
+                raise ValueError("Invalid matrix format")
+            return True
         # Check if the input is a list of lists
         if not isinstance(matrix, list) or not all(isinstance(row, list) for row in matrix):
             raise ValueError("Invalid matrix format")
@@ -161,8 +264,13 @@ class MatrixModel:
             matrix: List of lists representing the matrix
             
         Returns:
-            SymPy Matrix object ready for symbolic computation
+            SymPy Matrix object ready for symbolic computation (immutable when
+            every element is already a SymPy object)
         """
+        if matrix and matrix[0] and all(isinstance(x, sp.Basic) for row in matrix for x in row):
+            # Already-parsed elements: build from (rows, cols, flat list) without a nested copy
+            return sp.ImmutableMatrix(len(matrix), len(matrix[0]),
+                                      [x for row in matrix for x in row])
         return sp.Matrix(matrix)  # Convert list of lists to SymPy Matrix
     
     def ensure_native_types(self, matrix: List[List[Any]]) -> List[List[Any]]:
@@ -181,6 +289,15 @@ class MatrixModel:
         Returns:
             Matrix with elements as native Python types or symbolic expressions
         """
+        # Fast path: a matrix whose every element converts to float does so in one C pass.
+        # NaN means a None (or a real NaN) was present; the loop below maps None to 0.0.
+        try:
+            arr = np.asarray(matrix, dtype=np.float64)
+        except (TypeError, ValueError):
+            arr = None  # Symbolic, non-numeric string or ragged input
+        if arr is not None and arr.ndim == 2 and not np.isnan(arr).any():
+            return arr.tolist()
+        
         result = []
         for row in matrix:
             # Loop through each row in the matrix to convert elements to native types
@@ -188,6 +305,11 @@ class MatrixModel:
             for element in row:
                 # Loop through each element in the row to convert it
                 try:
+                    # Common element types: direct table lookup
+                    convert = _NATIVE_CONVERTERS.get(type(element))
+                    if convert is not None:
+                        native_row.append(convert(element))
+                        continue
                     # Handle None
                     if element is None:
                         native_row.append(0.0)
@@ -229,50 +351,75 @@ class MatrixModel:
             result.append(native_row)
         return result
     
-    def add_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]]) -> List[List[Any]]:
-        print(f"[TRACE] MatrixModel.add_matrices called with:\nmatrix1={matrix1}\nmatrix2={matrix2}")
+    def _numeric_operation(self, matrix1: List[List[Any]], matrix2: List[List[Any]], operation) -> Union[np.ndarray, None]:
+        """Apply a NumPy operation (np.add, np.subtract, np.matmul) to two numeric matrices.
+        
+        The result stays a float64 ndarray; it only becomes nested lists at the
+        serialization boundary (NetUtils.encode_message, serialize_matrix_result).
+        
+        Returns None when the SymPy path must be used instead: a non-numeric
+        element, or integer inputs whose result could leave float64's exact range.
+        """
+        a = _as_float_array(matrix1)
+        b = _as_float_array(matrix2)
+        if a is None or b is None:
+            return None
+        (a, max_a), (b, max_b) = a, b
+        if max_a is not None and max_b is not None:
+            # All-integer inputs: SymPy would give the exact integer, so float64 must too
+            bound = max_a * max_b * b.shape[0] if operation is np.matmul else max_a + max_b
+            if bound >= _FLOAT_EXACT:
+                return None
+        return operation(a, b) + 0.0  # + 0.0 turns -0.0 into 0.0
+
+    def add_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]], simplify: bool = True) -> Union[np.ndarray, List[List[Any]]]:
+        _log.debug("MatrixModel.add_matrices called with:\nmatrix1=%s\nmatrix2=%s", matrix1, matrix2)
         # Validate inputs
         self.validate_matrix(matrix1)
         self.validate_matrix(matrix2)
         if len(matrix1) != len(matrix2) or len(matrix1[0]) != len(matrix2[0]):
             raise ValueError("Matrices must have the same dimensions for addition")
-        m1 = self.to_sympy_matrix(matrix1)  # Convert to SymPy Matrix
-        m2 = self.to_sympy_matrix(matrix2)  # Convert to SymPy Matrix
-        result = m1 + m2  # SymPy matrix addition
-        result_list = result.tolist()  # Convert SymPy Matrix to list of lists
-        simplified = self.simplify_result(result_list)
-        final_result = self.ensure_native_types(simplified)
-        print(f"[TRACE] MatrixModel.add_matrices result: {final_result}")
+        final_result = self._numeric_operation(matrix1, matrix2, np.add)  # float64 ndarray
+        if final_result is None:
+            # Element-wise sums directly; no Matrix objects to build and unpack
+            result_list = [[sympify(a) + sympify(b) for a, b in zip(row1, row2)]
+                           for row1, row2 in zip(matrix1, matrix2)]
+            simplified = self.simplify_result(result_list) if simplify else result_list
+            final_result = self.ensure_native_types(simplified)
+        _log.debug("MatrixModel.add_matrices result: %s", final_result)
         return final_result
     
-    def subtract_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]]) -> List[List[Any]]:
-        print(f"[TRACE] MatrixModel.subtract_matrices called with:\nmatrix1={matrix1}\nmatrix2={matrix2}")
+    def subtract_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]], simplify: bool = True) -> Union[np.ndarray, List[List[Any]]]:
+        _log.debug("MatrixModel.subtract_matrices called with:\nmatrix1=%s\nmatrix2=%s", matrix1, matrix2)
         self.validate_matrix(matrix1)
         self.validate_matrix(matrix2)
         if len(matrix1) != len(matrix2) or len(matrix1[0]) != len(matrix2[0]):
             raise ValueError("Matrices must have the same dimensions for subtraction")
-        m1 = self.to_sympy_matrix(matrix1)  # Convert to SymPy Matrix
-        m2 = self.to_sympy_matrix(matrix2)  # Convert to SymPy Matrix
-        result = m1 - m2  # SymPy matrix subtraction
-        result_list = result.tolist()  # Convert SymPy Matrix to list of lists
-        simplified = self.simplify_result(result_list)
-        final_result = self.ensure_native_types(simplified)
-        print(f"[TRACE] MatrixModel.subtract_matrices result: {final_result}")
+        final_result = self._numeric_operation(matrix1, matrix2, np.subtract)  # float64 ndarray
+        if final_result is None:
+            # Element-wise differences directly; no Matrix objects to build and unpack
+            result_list = [[sympify(a) - sympify(b) for a, b in zip(row1, row2)]
+                           for row1, row2 in zip(matrix1, matrix2)]
+            simplified = self.simplify_result(result_list) if simplify else result_list
+            final_result = self.ensure_native_types(simplified)
+        _log.debug("MatrixModel.subtract_matrices result: %s", final_result)
         return final_result
     
-    def multiply_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]]) -> List[List[Any]]:
-        print(f"[TRACE] MatrixModel.multiply_matrices called with:\nmatrix1={matrix1}\nmatrix2={matrix2}")
+    def multiply_matrices(self, matrix1: List[List[Any]], matrix2: List[List[Any]], simplify: bool = True) -> Union[np.ndarray, List[List[Any]]]:
+        _log.debug("MatrixModel.multiply_matrices called with:\nmatrix1=%s\nmatrix2=%s", matrix1, matrix2)
         self.validate_matrix(matrix1)
         self.validate_matrix(matrix2)
         if len(matrix1[0]) != len(matrix2):
             raise ValueError("Number of columns in first matrix must equal number of rows in second matrix")
-        m1 = self.to_sympy_matrix(matrix1)  # Convert to SymPy Matrix
-        m2 = self.to_sympy_matrix(matrix2)  # Convert to SymPy Matrix
-        result = m1 * m2  # SymPy matrix multiplication
-        result_list = result.tolist()  # Convert SymPy Matrix to list of lists
-        simplified = self.simplify_result(result_list)
-        final_result = self.ensure_native_types(simplified)
-        print(f"[TRACE] MatrixModel.multiply_matrices result: {final_result}")
+        final_result = self._numeric_operation(matrix1, matrix2, np.matmul)  # float64 ndarray
+        if final_result is None:
+            m1 = self.to_sympy_matrix(matrix1)  # Convert to SymPy Matrix
+            m2 = self.to_sympy_matrix(matrix2)  # Convert to SymPy Matrix
+            result = m1 * m2  # SymPy matrix multiplication
+            result_list = result.tolist()  # Convert SymPy Matrix to list of lists
+            simplified = self.simplify_result(result_list) if simplify else result_list
+            final_result = self.ensure_native_types(simplified)
+        _log.debug("MatrixModel.multiply_matrices result: %s", final_result)
         return final_result
     
     def serialize_matrix_result(self, result: List[List[Any]]) -> Dict[str, Any]:
@@ -296,8 +443,17 @@ class MatrixModel:
             Dictionary containing serialized matrix data
         """
         try:
-            # Convert to native types while preserving symbolic expressions
-            processed_matrix = self.ensure_native_types(result)  # Convert to native types
+            # Purely numeric input (the usual case, and every numeric operation result)
+            # converts in one C-level pass; anything else goes element by element
+            try:
+                arr = np.asarray(result)
+            except ValueError:
+                arr = None  # Ragged rows: let the element-wise path handle them
+            if arr is not None and arr.ndim == 2 and arr.dtype.kind in 'fiu':
+                processed_matrix = arr.astype(np.float64, copy=False).tolist()
+            else:
+                # Convert to native types while preserving symbolic expressions
+                processed_matrix = self.ensure_native_types(result)  # Convert to native types
             
             # Create dimensions
             dimensions = {
@@ -343,6 +499,17 @@ class MatrixModel:
         Returns:
             Formatted string representation of the matrix
         """
+        # Purely numeric matrices (int/float, as lists or a result ndarray): format,
+        # measure and pad whole arrays at once instead of cell by cell
+        try:
+            arr = np.asarray(matrix)
+        except ValueError:
+            arr = None  # Ragged rows
+        if arr is not None and arr.ndim == 2 and arr.size and arr.dtype.kind in 'fiu':
+            cells = np.char.mod(f"%.{precision}f", arr)  # Same text as f"{val:.{precision}f}"
+            cells = np.char.rjust(cells, np.char.str_len(cells).max(axis=0))
+            return "\n".join("  ".join(row) for row in cells.tolist())
+        
         # Convert numeric values to formatted strings and keep symbolic elements as is
         formatted_rows = []
         for row in matrix:
@@ -355,7 +522,7 @@ class MatrixModel:
                 elif isinstance(val, (sp.Basic, sp.Expr, sp.Symbol)):
                     # For symbolic expressions, use sympy's string representation
                     try:
-                        simplified = sp.simplify(val)  # Simplify symbolic expression
+                        simplified = _cached_simplify(val)  # Simplify symbolic expression
                         formatted_row.append(str(simplified))
                     except:
                         formatted_row.append(str(val))
@@ -415,7 +582,8 @@ class MatrixModel:
         """Simplify the symbolic expressions in the result matrix.
         
         Process:
-        - Attempts to simplify each symbolic element
+        - Attempts to simplify each symbolic element, once per distinct expression
+          across calls (symbolic results repeat the same cell expressions)
         - Preserves numeric values
         - Handles failed simplifications gracefully
         - Maintains matrix structure
@@ -432,10 +600,10 @@ class MatrixModel:
             simplified_row = []
             for element in row:
                 # Loop through each element in the row to simplify if symbolic
-                if isinstance(element, (sp.Basic, sp.Expr, sp.Symbol)):
+                if isinstance(element, sp.Basic) and not element.is_Number:  # Numbers are already canonical
                     try:
                         # Try to simplify the expression
-                        simplified_row.append(sp.simplify(element))  # Simplify symbolic element
+                        simplified_row.append(_cached_simplify(element))  # Simplify symbolic element
                     except Exception:
                         # If simplification fails, keep original
                         simplified_row.append(element)
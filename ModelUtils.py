@@ -7,8 +7,19 @@ import math  # Added import for math.factorial
 from typing import Dict, Any, Tuple
 import logging
 import os
+import sys
 import re
 
+# Tokenizer for calculator expressions: numbers, operators and whitespace runs
+_TOKEN_RE = re.compile(r'([0-9A-Fa-f]+|[\+\-\*\/\(\)]|\s+)')
+
+# Operator and "nothing to operate on yet" token classes for the expression validator
+_CALC_OPERATORS = frozenset('+-*/')
+_OPERAND_EXPECTED = frozenset((None, 'operator', 'open_paren'))
+
+# Longest calculator expression accepted: 64 of the widest (64-digit BIN) numbers
+_MAX_EXPR_LEN = 64 * 64
+
 # Shared function dictionary
 FUNCTIONS = {
     'sin': sp.sin,
@@ -144,27 +155,30 @@ def validate_input(input_type: str, value, **kwargs):
         expr = value
         base = kwargs.get('base', 'DEC')
         base_configs = kwargs.get('base_configs')
-        get_max_digits = kwargs.get('get_max_digits')
         if not isinstance(expr, str):
             raise ValueError("Expression must be a string")
         if not expr or expr.isspace():
             raise ValueError("Expression cannot be empty")
+        if len(expr) > _MAX_EXPR_LEN:  # Reject before the tokenizer scans it
+            raise ValueError(f"Expression too long: {len(expr)} > {_MAX_EXPR_LEN} characters")
         if base not in base_configs:
             raise ValueError(f"Invalid base: {base}. Must be one of {list(base_configs.keys())}")
-        valid_digits = base_configs[base]['valid_digits']
+        config = base_configs[base]  # One lookup; fields are plain attribute loads
+        strip_table = config.strip_table  # Deletes every valid digit
+        max_digits = config.max_display_digits  # Read once, not via get_max_digits() per token
         
-        tokens = re.findall(r'([0-9A-Fa-f]+|[\+\-\*\/\(\)]|\s+)', expr)
-        tokens = [t for t in tokens if not t.isspace()]
-        if not tokens:
-            raise ValueError("Expression contains no valid tokens")
         prev_token_type = None
         paren_count = 0
         operator_count = 0
         number_count = 0
-        for token in tokens:
-            if token in '+-*/':
+        for match in _TOKEN_RE.finditer(expr):
+            # Single pass over the expression, skipping whitespace runs
+            token = match.group()
+            if token.isspace():
+                continue
+            if token in _CALC_OPERATORS:
                 operator_count += 1
-                if prev_token_type in [None, 'operator', 'open_paren']:
+                if prev_token_type in _OPERAND_EXPECTED:
                     if token not in '+-' or prev_token_type == 'operator':
                         raise ValueError(f"Invalid operator placement: '{token}' after {prev_token_type}")
                 prev_token_type = 'operator'
@@ -174,23 +188,26 @@ def validate_input(input_type: str, value, **kwargs):
                 paren_count += 1
                 prev_token_type = 'open_paren'
             elif token == ')':
-                if prev_token_type in [None, 'operator', 'open_paren']:
+                if prev_token_type in _OPERAND_EXPECTED:
                     raise ValueError("Invalid closing parenthesis placement - no expression inside parentheses")
                 paren_count -= 1
                 if paren_count < 0:
                     raise ValueError("Unmatched closing parenthesis")
                 prev_token_type = 'close_paren'
             else:
-                if not all(d in valid_digits for d in token.upper()):
-                    invalid_digits = [d for d in token.upper() if d not in valid_digits]
+                leftover = token.translate(strip_table)  # Anything left over is an invalid digit
+                if leftover:
+                    invalid_digits = list(leftover.upper())
                     raise ValueError(f"Invalid digit(s) {invalid_digits} for {base} number: {token}")
-                if len(token) > get_max_digits(base):
-                    raise ValueError(f"Number {token} exceeds maximum length of {get_max_digits(base)} digits for {base}")
+                if len(token) > max_digits:
+                    raise ValueError(f"Number {token} exceeds maximum length of {max_digits} digits for {base}")
                 if prev_token_type == 'close_paren':
                     raise ValueError("Missing operator after parenthesis")
                 prev_token_type = 'number'
                 number_count += 1
                             
+        if prev_token_type is None:
+            raise ValueError("Expression contains no valid tokens")
         if paren_count > 0:
             raise ValueError(f"Unclosed parenthesis: missing {paren_count} closing parenthesis")
         if prev_token_type == 'operator':
@@ -234,9 +251,60 @@ def validate_input(input_type: str, value, **kwargs):
     else:
         raise ValueError(f"Unknown input_type for validation: {input_type}")
 
-def log_server_event(event_type: str, message: str):
+def log_server_event(event_type: str, message: str, *args):
+    """Log a server event; `message` is a %-style template filled from `args` only if the record is emitted."""
     logging.basicConfig(filename=os.path.join(os.path.dirname(__file__), 'logs', 'server.log'), level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    logging.log(logging.INFO, f'{event_type}: {message}')
+    logging.log(logging.INFO, '%s: ' + message, event_type, *args)
+
+def _handle_calculator(controller, instructions: dict):
+    expr = instructions.get("expr")
+    base = instructions.get("base", "DEC")
+    if isinstance(base, str):
+        base = sys.intern(base)  # Decoded JSON strings aren't interned; make base-table probes hit by identity
+    validate_input('expression', expr, base=base, base_configs=controller.calc_model.base_configs)
+    bases = instructions.get("bases")
+    if bases:
+        # One evaluation rendered in every requested base, e.g. for all of the client's displays
+        return controller.calc_model.evaluate_expression_bases(expr, base, bases)
+    return controller.calc_model.evaluate_expression(expr, base)
+
+_MATRIX_OPERATIONS = {  # operation -> MatrixModel method name
+    "add": "add_matrices",
+    "subtract": "subtract_matrices",
+    "multiply": "multiply_matrices",
+}
+
+def _handle_matrix(controller, instructions: dict):
+    op = instructions.get("operation")
+    m1 = instructions.get("matrix1")
+    m2 = instructions.get("matrix2")
+    # Parse matrix input strings to lists
+    m1_parsed = controller.matrix_model.parse_matrix_input(m1) if isinstance(m1, str) else m1
+    m2_parsed = controller.matrix_model.parse_matrix_input(m2) if isinstance(m2, str) else m2
+    validate_input('matrix', m1_parsed)
+    validate_input('matrix', m2_parsed)
+    method_name = _MATRIX_OPERATIONS.get(op)
+    if method_name is None:
+        raise ValueError("Unknown matrix operation")
+    return getattr(controller.matrix_model, method_name)(m1_parsed, m2_parsed)
+
+def _handle_solver(controller, instructions: dict):
+    eq = instructions.get("equation")
+    validate_input('symbolic_expression', eq, variable='x')
+    return controller.solver_model.solve_equation(eq)
+
+def _handle_plotter(controller, instructions: dict):
+    eq = instructions.get("equation")
+    validate_input('symbolic_expression', eq, variable='x')
+    return controller.plotter_model.plot_equation(eq)
+
+# model name -> handler(controller, instructions); one dict probe instead of an if/elif chain
+_MODEL_HANDLERS = {
+    "calculator": _handle_calculator,
+    "matrix": _handle_matrix,
+    "solver": _handle_solver,
+    "plotter": _handle_plotter,
+}
 
 def handle_model_request(controller, model_name: str, instructions: dict):
     """
@@ -245,45 +313,14 @@ def handle_model_request(controller, model_name: str, instructions: dict):
     - model_name: 'calculator', 'matrix', 'solver', 'plotter'
     - instructions: dict with operation and data
     """
-    log_server_event('Request Received', f'Model: {model_name}, Instructions: {instructions}')
+    log_server_event('Request Received', 'Model: %s, Instructions: %s', model_name, instructions)
+    handler = _MODEL_HANDLERS.get(model_name)
+    if handler is None:
+        log_server_event('Error', 'Unknown model: %s', model_name)
+        raise ValueError(f"Unknown model: {model_name}")
+    result = handler(controller, instructions)
     if model_name == "calculator":
-        expr = instructions.get("expr")
-        base = instructions.get("base", "DEC")
-        validate_input('expression', expr, base=base, base_configs=controller.calc_model.base_configs, get_max_digits=controller.calc_model.get_max_digits)
-        result = controller.calc_model.evaluate_expression(expr, base)
-        log_server_event('Request Processed', f'Result for {model_name}: {result}')
-        return result
-    elif model_name == "matrix":
-        op = instructions.get("operation")
-        m1 = instructions.get("matrix1")
-        m2 = instructions.get("matrix2")
-        # Parse matrix input strings to lists
-        m1_parsed = controller.matrix_model.parse_matrix_input(m1) if isinstance(m1, str) else m1
-        m2_parsed = controller.matrix_model.parse_matrix_input(m2) if isinstance(m2, str) else m2
-        validate_input('matrix', m1_parsed)
-        validate_input('matrix', m2_parsed)
-        if op == "add":
-            result = controller.matrix_model.add_matrices(m1_parsed, m2_parsed)
-        elif op == "subtract":
-            result = controller.matrix_model.subtract_matrices(m1_parsed, m2_parsed)
-        elif op == "multiply":
-            result = controller.matrix_model.multiply_matrices(m1_parsed, m2_parsed)
-        else:
-            raise ValueError("Unknown matrix operation")
-        log_server_event('Request Processed', f'Result for {model_name}: Success')
-        return result
-    elif model_name == "solver":
-        eq = instructions.get("equation")
-        validate_input('symbolic_expression', eq, variable='x')
-        result = controller.solver_model.solve_equation(eq)
-        log_server_event('Request Processed', f'Result for {model_name}: Success')
-        return result
-    elif model_name == "plotter":
-        eq = instructions.get("equation")
-        validate_input('symbolic_expression', eq, variable='x')
-        result = controller.plotter_model.plot_equation(eq)
-        log_server_event('Request Processed', f'Result for {model_name}: Success')
-        return result
+        log_server_event('Request Processed', 'Result for %s: %s', model_name, result)
     else:
-        log_server_event('Error', f'Unknown model: {model_name}')
-        raise ValueError(f"Unknown model: {model_name}") 
\ No newline at end of file
+        log_server_event('Request Processed', 'Result for %s: Success', model_name)
+    return result
@@ -0,0 +1,106 @@
+# NetUtils.py
+# Message encoding and length-prefixed framing shared by the client and the server
+
+import json
+import socket
+import struct
+from typing import Any, Optional
+
+try:
+    import orjson  # Optional: faster JSON that encodes straight to bytes and handles NumPy arrays
+except ImportError:
+    orjson = None
+
+_SIZE_PREFIX = struct.Struct('>I')  # 4-byte big-endian unsigned message length
+MAX_MESSAGE_SIZE = 1024 * 1024  # 1MB limit, protects against memory exhaustion
+_GATHER_MIN = 16 * 1024  # Below this, copying the payload behind the prefix is cheaper than a gather send
+
+def _json_default(obj):
+    """Fallback encoder hook for NumPy arrays and scalars (orjson serializes them natively)."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    def encode_message(obj: Any) -> bytes:
+        """Serialize a message to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    decode_message = orjson.loads
+else:
+    def encode_message(obj: Any) -> bytes:
+        """Serialize a message to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(',', ':'), default=_json_default).encode('utf-8')
+    decode_message = json.loads  # Accepts UTF-8 bytes directly
+
+def recv_exact(sock, n: int, retry_timeouts: bool = False) -> Optional[bytearray]:
+    """Receive exactly n bytes from a socket, or None if the peer closed first.
+    
+    Reads straight into one preallocated buffer (recv_into), so no
+    per-chunk bytes objects are created or copied. With retry_timeouts, a
+    socket timeout keeps waiting instead of raising, without losing the
+    bytes already received.
+    """
+    data = bytearray(n)
+    view = memoryview(data)
+    received = 0
+    while received < n:
+        try:
+            count = sock.recv_into(view[received:], n - received)
+        except socket.timeout:
+            if retry_timeouts:
+                continue
+            raise
+        if not count:  # Connection closed by peer
+            return None
+        received += count
+    return data
+
+def _sendmsg_all(sock, buffers) -> None:
+    """sendall() for a list of buffers: gather-send until every byte is written."""
+    views = [memoryview(buf) for buf in buffers]
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:  # Drop fully sent buffers and trim a partially sent one
+            if sent < len(views[0]):
+                views[0] = views[0][sent:]
+                break
+            sent -= len(views[0])
+            del views[0]
+
+def send_frame(sock, payload: bytes) -> None:
+    """Send one message as a 4-byte big-endian length followed by the payload.
+    
+    Large payloads go out with sendmsg() so they aren't copied just to put the
+    prefix in front; sockets without it (Windows, TLS) send the two parts
+    separately, which relies on TCP_NODELAY being set on the connection.
+    """
+    prefix = _SIZE_PREFIX.pack(len(payload))
+    if len(payload) < _GATHER_MIN:
+        sock.sendall(prefix + payload)
+        return
+    try:
+        _sendmsg_all(sock, (prefix, payload))
+    except (AttributeError, NotImplementedError):
+        sock.sendall(prefix)
+        sock.sendall(payload)
+
+def recv_frame(sock, retry_timeouts: bool = False) -> Optional[bytearray]:
+    """Receive one length-prefixed message.
+    
+    Args:
+        sock: Connected socket to receive from
+        retry_timeouts: Keep waiting through socket timeouts (see recv_exact)
+        
+    Returns:
+        The payload, or None if the connection was closed between or during messages
+        
+    Raises:
+        ValueError: If the announced size exceeds MAX_MESSAGE_SIZE
+    """
+    size_data = recv_exact(sock, _SIZE_PREFIX.size, retry_timeouts)
+    if size_data is None:
+        return None
+    message_size = _SIZE_PREFIX.unpack(size_data)[0]
+    if message_size > MAX_MESSAGE_SIZE:
+        raise ValueError("Message size too large")
+    return recv_exact(sock, message_size, retry_timeouts)
@@ -12,6 +12,7 @@ from CalculatorModel import CalculatorModel  # Mathematical calculation handling
 from SolverModel import SolverModel         # Equation solving functionality
 from PlotterModel import PlotterModel       # Equation plotting functionality
 from MatrixModel import MatrixModel         # Matrix operations functionality
+from NetUtils import send_frame, recv_frame # Length-prefixed framing shared with the Controller
 
 class MathServer:
     """A secure, multi-threaded mathematical processing server.
@@ -194,43 +195,28 @@ class MathServer:
         # Log server start
         self.logger.info("Server started")
 
-    def _recv_all(self, sock, n):
-        """Reliably receive exactly n bytes from a socket.
+    def _recv_message(self, sock):
+        """Reliably receive one length-prefixed message from a socket.
         
-        This method handles:
-        - Partial receives
-        - Connection timeouts
-        - Connection closures
-        - Socket errors
+        Framing and the size limit come from NetUtils.recv_frame; this wrapper
+        only adds the server's connection handling:
+        - Timeouts keep waiting (without losing a partially received message)
+        - Socket errors are treated like a closed connection
         
         Args:
             sock: Connected socket to receive from
-            n: Exact number of bytes to receive
             
         Returns:
-            bytearray: Received data, or None if connection closed/error
+            bytearray: Received message, or None if connection closed/error
             
-        Notes:
-        - Blocks until all bytes received
-        - Handles timeouts gracefully
-        - Returns None on connection closure
+        Raises:
+            ValueError: If the announced size exceeds the 1MB limit
         """
-        data = bytearray()
-        while len(data) < n:
-            # Loop to receive data until the required number of bytes (n) is collected
-            try:
-                # Receive remaining bytes
-                packet = sock.recv(n - len(data))
-                if not packet:  # Connection closed by client
-                    return None
-                data.extend(packet)
-            except socket.timeout:
-                # Handle timeout by continuing the loop
-                continue
-            except Exception:
-                # Handle any other socket errors
-                return None
-        return data
+        try:
+            return recv_frame(sock, retry_timeouts=True)
+        except OSError:
+            # Socket errors end the connection like a clean close
+            return None
 
     def handle_client(self, client_socket, addr):
         """Handle individual client connections in a separate thread.
@@ -276,42 +262,30 @@ class MathServer:
             
         # Set socket timeout
         client_socket.settimeout(self.client_timeout)
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Prefix and payload may be sent separately
         
         while self.running:
             # Main loop to process client requests as long as the server is running
             try:
-                # Receive message size (4 bytes for uint32)
-                size_data = self._recv_all(client_socket, 4)
-                if not size_data:
-                    # If no data is received, client has disconnected
-                    break
-                
-                # Convert size bytes to integer
-                message_size = int.from_bytes(size_data, byteorder='big')
-                
-                # Protect against memory exhaustion attacks
-                if message_size > 1024 * 1024:  # 1MB limit
-                    # If the message is too large, prevent memory exhaustion
-                    raise ValueError("Message size too large")
-                
-                # Receive the actual message data
-                data = self._recv_all(client_socket, message_size)
+                # Receive the size-prefixed message (oversized ones raise ValueError)
+                data = self._recv_message(client_socket)
                 if not data:
                     # If no message data is received, client has disconnected
                     break
                 
                 # Parse JSON request
                 request = json.loads(data.decode())
-                self.logger.info(f"Received from {addr}: {json.dumps(request, indent=2)}")
+                self.logger.info("Received %d bytes from %s", len(data), addr)
                 
                 # Process the request and get response
                 response = self.process_request(request)
-                self.logger.info(f"Sending to {addr}: {json.dumps(response, indent=2)}")
                 
-                # Send response with size prefix
+                # Serialize once; the log line reuses the size instead of re-encoding
                 response_data = json.dumps(response).encode()
-                size_prefix = len(response_data).to_bytes(4, byteorder='big')
-                client_socket.sendall(size_prefix + response_data)
+                self.logger.info("Sending %d bytes to %s", len(response_data), addr)
+                
+                # Send response with size prefix
+                send_frame(client_socket, response_data)
                 
             except socket.timeout:
                 # If waiting for data times out, log warning and continue to next loop iteration
@@ -353,8 +327,7 @@ class MathServer:
         """
         try:
             response_data = json.dumps(error_response).encode()
-            size_prefix = len(response_data).to_bytes(4, byteorder='big')
-            client_socket.sendall(size_prefix + response_data)
+            send_frame(client_socket, response_data)
         except Exception as e:
             self.logger.error(f"Error sending error response: {str(e)}")
 
@@ -390,30 +363,28 @@ class MathServer:
         - Response formatting errors
         """
         try:
-            # Format the request for logging
-            request_log = (
-                f"Request Type: {request['type']}\n"
-                f"Request Data: {json.dumps(request, indent=2)}"  # json.dumps for pretty printing
-            )
-            self.logger.info(request_log)  # Log the incoming request
+            # Log the incoming request; the pretty-printed copy is only built for DEBUG
+            self.logger.info("Request Type: %s", request['type'])
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Request Data: %s", json.dumps(request, indent=2))
             response = None
             if request["type"] == "calculate":  # If request is for calculation
                 # Handle mathematical calculation request
                 expr = request["expr"]
                 base = request["base"]
-                print(f"[TRACE] Received calculation request: expr={expr}, base={base}")
+                self.logger.debug("Received calculation request: expr=%s, base=%s", expr, base)
                 result = self.calc_model.evaluate_expression(expr, base)
-                print(f"[TRACE] Calculation result: {result}")
+                self.logger.debug("Calculation result: %s", result)
                 response = self.calc_model.serialize_calculation(expr, base, result)
-                print(f"[TRACE] Serialized calculation response: {response}")
+                self.logger.debug("Serialized calculation response: %s", response)
             elif request["type"] == "solve":  # If request is for equation solving
                 # Handle equation solving request
                 equation = request["equation"]
-                print(f"[TRACE] Received equation to solve: {equation}")
+                self.logger.debug("Received equation to solve: %s", equation)
                 result = self.solver_model.solve_equation(equation)
-                print(f"[TRACE] Solution steps generated: {result}")
+                self.logger.debug("Solution steps generated: %s", result)
                 response = self.solver_model.serialize_solution(equation, result)
-                print(f"[TRACE] Serialized response to send: {response}")
+                self.logger.debug("Serialized response to send: %s", response)
             elif request["type"] == "plot":  # If request is for plotting
                 # Handle equation plotting request
                 equation = request["equation"]
@@ -423,14 +394,14 @@ class MathServer:
                 # Handle matrix addition
                 matrix1_str = request["matrix1"]
                 matrix2_str = request["matrix2"]
-                print(f"[TRACE] Received matrix_add request:\nmatrix1={matrix1_str}\nmatrix2={matrix2_str}")
+                self.logger.debug("Received matrix_add request:\nmatrix1=%s\nmatrix2=%s", matrix1_str, matrix2_str)
                 try:
                     matrix1 = self.matrix_model.parse_matrix_input(matrix1_str)
                     matrix2 = self.matrix_model.parse_matrix_input(matrix2_str)
                     result = self.matrix_model.add_matrices(matrix1, matrix2)
-                    print(f"[TRACE] Matrix addition result: {result}")
+                    self.logger.debug("Matrix addition result: %s", result)
                     serialized = self.matrix_model.serialize_matrix_result(result)
-                    print(f"[TRACE] Serialized matrix_add response: {serialized}")
+                    self.logger.debug("Serialized matrix_add response: %s", serialized)
                     response = {
                         "type": "matrix_operation",
                         "operation": "addition",
@@ -457,14 +428,14 @@ class MathServer:
                 # Handle matrix subtraction
                 matrix1_str = request["matrix1"]
                 matrix2_str = request["matrix2"]
-                print(f"[TRACE] Received matrix_subtract request:\nmatrix1={matrix1_str}\nmatrix2={matrix2_str}")
+                self.logger.debug("Received matrix_subtract request:\nmatrix1=%s\nmatrix2=%s", matrix1_str, matrix2_str)
                 try:
                     matrix1 = self.matrix_model.parse_matrix_input(matrix1_str)
                     matrix2 = self.matrix_model.parse_matrix_input(matrix2_str)
                     result = self.matrix_model.subtract_matrices(matrix1, matrix2)
-                    print(f"[TRACE] Matrix subtraction result: {result}")
+                    self.logger.debug("Matrix subtraction result: %s", result)
                     serialized = self.matrix_model.serialize_matrix_result(result)
-                    print(f"[TRACE] Serialized matrix_subtract response: {serialized}")
+                    self.logger.debug("Serialized matrix_subtract response: %s", serialized)
                     response = {
                         "type": "matrix_operation",
                         "operation": "subtraction",
@@ -491,14 +462,14 @@ class MathServer:
                 # Handle matrix multiplication
                 matrix1_str = request["matrix1"]
                 matrix2_str = request["matrix2"]
-                print(f"[TRACE] Received matrix_multiply request:\nmatrix1={matrix1_str}\nmatrix2={matrix2_str}")
+                self.logger.debug("Received matrix_multiply request:\nmatrix1=%s\nmatrix2=%s", matrix1_str, matrix2_str)
                 try:
                     matrix1 = self.matrix_model.parse_matrix_input(matrix1_str)
                     matrix2 = self.matrix_model.parse_matrix_input(matrix2_str)
                     result = self.matrix_model.multiply_matrices(matrix1, matrix2)
-                    print(f"[TRACE] Matrix multiplication result: {result}")
+                    self.logger.debug("Matrix multiplication result: %s", result)
                     serialized = self.matrix_model.serialize_matrix_result(result)
-                    print(f"[TRACE] Serialized matrix_multiply response: {serialized}")
+                    self.logger.debug("Serialized matrix_multiply response: %s", serialized)
                     response = {
                         "type": "matrix_operation",
                         "operation": "multiplication",
@@ -524,12 +495,10 @@ class MathServer:
             else:  # If request type is not recognized
                 # Handle unknown request types by returning an error
                 response = {"error": "Invalid request type"}
-            # Format the response for logging
-            response_log = (
-                f"Response for {request['type']}:\n"
-                f"Response Data: {json.dumps(response, indent=2)}"  # json.dumps for pretty printing
-            )
-            self.logger.info(response_log)  # Log the outgoing response
+            # Log the outgoing response; pretty-printing is DEBUG-only
+            self.logger.info("Response ready for %s", request['type'])
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Response Data: %s", json.dumps(response, indent=2))
             return response
         except Exception as e:
             # If any error occurs during request processing, log and return error
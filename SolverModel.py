@@ -5,6 +5,9 @@ import re  # Regular expressions
 from typing import Dict, List, Tuple, Any, Optional
 from ModelUtils import add_multiplication, serialize_plot, deserialize_plot, FUNCTIONS, format_expression
 
+# Precompiled matchers for function names used without a call, e.g. "sin" in "sin*x"
+_BARE_FUNCTION_RES = [(re.compile(r'\b' + func_name + r'\b(?!\()'), str(func)) for func_name, func in FUNCTIONS.items()]
+
 class SolverModel:
     """A model class for solving mathematical equations and plotting functions.
     
@@ -109,9 +112,9 @@ class SolverModel:
                 locals_dict = {**self.functions, 'x': x}
                 
                 # Loop through all function names to replace standalone names with actual functions
-                for func_name, func in self.functions.items():
-                    left = re.sub(r'\b' + func_name + r'\b(?!\()', str(func), left)
-                    right = re.sub(r'\b' + func_name + r'\b(?!\()', str(func), right)
+                for pattern, replacement in _BARE_FUNCTION_RES:
+                    left = pattern.sub(replacement, left)
+                    right = pattern.sub(replacement, right)
                 
                 # Convert the expressions to SymPy objects
                 left_expr = sp.parse_expr(left, local_dict=locals_dict, transformations='all')
@@ -268,6 +268,17 @@ class CalculatorView:
                     btn.grid(row=row, column=col+3, padx=2, pady=2)  # Offset by 3 columns
                     self.calc_buttons[text] = btn
         
+        # The same buttons grouped by role, so the controller can wire each group directly
+        command_keys = ('=', 'CE', '⌫')
+        self.calc_base_buttons = [(base, self.calc_buttons[base]) for base in base_buttons]
+        self.calc_equal_button = self.calc_buttons['=']
+        self.calc_clear_button = self.calc_buttons['CE']
+        self.calc_backspace_button = self.calc_buttons['⌫']
+        self.calc_key_buttons = [  # Digits, hex letters and operators: each appends its text
+            (text, btn) for text, btn in self.calc_buttons.items()
+            if text not in command_keys and text not in base_buttons
+        ]
+        
         # Initially disable buttons based on decimal base
         self._update_button_states('DEC')
         
@@ -554,6 +565,24 @@ class CalculatorView:
         self.calc_entry.delete(0, tk.END)
         self.calc_entry.insert(0, text)
         
+    def append_calc_text(self, text: str):
+        """Append text to the end of the calculator entry.
+        
+        Args:
+            text: Text to add after the current entry
+        """
+        self.calc_entry.insert(tk.END, text)
+        
+    def delete_calc_last_char(self):
+        """Remove the last character of the calculator entry.
+        
+        Deletes by index so the rest of the text is left in place
+        rather than cleared and re-inserted.
+        """
+        end = self.calc_entry.index(tk.END)  # Number of characters in the entry
+        if end:
+            self.calc_entry.delete(end - 1)
+        
     def set_solver_output(self, text: str):
         """Set the solver output text with proper formatting.
         